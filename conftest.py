@@ -0,0 +1,45 @@
+def pytest_addoption(parser):
+    parser.addoption(
+        "--formal-jobs",
+        type=int,
+        default=None,
+        help="prove formal specs on a pool of this many processes ahead of the tests",
+    )
+    parser.addoption(
+        "--formal-batch",
+        action="store_true",
+        help="with --formal-jobs, check all specs of the same gate with one solver run",
+    )
+    parser.addoption(
+        "--formal-portfolio",
+        action="store_true",
+        help="race every available solver engine and keep the first result",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("--formal-portfolio"):
+        from snoot4.tests import utils
+
+        utils.usePortfolio = True
+
+
+def pytest_collection_modifyitems(config, items):
+    jobs = config.getoption("--formal-jobs")
+    if jobs is None:
+        return
+
+    from snoot4.tests.runner import discover, prefetch
+
+    specs = set(discover())
+    collected = [
+        item.callspec.params["spec"]
+        for item in items
+        if hasattr(item, "callspec") and item.callspec.params.get("spec") in specs
+    ]
+    prefetch(
+        list(dict.fromkeys(collected)),
+        jobs=jobs or None,
+        batch=config.getoption("--formal-batch"),
+        portfolio=config.getoption("--formal-portfolio"),
+    )
@@ -0,0 +1,341 @@
+from amaranth import Array, Cat, Module, Mux, Signal
+from amaranth.lib import data
+from amaranth.lib.wiring import Component, In, Out, Signature
+
+from snoot4.be.units import Alu, Cmp, Div, MemoryRead, MemoryWrite, Mul
+from snoot4.fe.decode import SEL_WIDTH, Decoder, Group, Unit
+from snoot4.rf.sim import RegisterFileSim
+
+# memory with one cycle of latency: a request is accepted when `ready` is set, and `rdata` is
+# the word at the `addr` of the cycle before
+DataBus = Signature(
+    {
+        "addr": Out(32),
+        "re": Out(1),
+        "we": Out(1),
+        "wstb": Out(4),
+        "wdata": Out(32),
+        "ready": In(1),
+        "rdata": In(32),
+    }
+)
+
+# an instruction on its way through X, M and W, as decoded in D
+_Control = data.StructLayout(
+    {
+        "valid": 1,
+        "unit": Unit,
+        "sel": SEL_WIDTH,
+        "rn": 4,
+        "rm": 4,
+        "read_t": 1,
+        "write_rn": 1,
+        "write_t": 1,
+    }
+)
+
+
+def _pairs(older, younger):
+    # SH-4 pairing rules: MT pairs with anything but CO, the other groups don't pair with
+    # themselves, and CO doesn't pair at all
+    return (
+        (older != Group.CO)
+        & (younger != Group.CO)
+        & ((older != younger) | (older == Group.MT))
+    )
+
+
+class Backend(Component):
+    """
+    Five stage pipeline executing the instructions of `fetch_insn`: D decodes and reads the
+    register file, X executes, M accesses memory and W writes back.
+
+    Up to `issue` instructions leave D together, one down each pipe, as long as the SH-4
+    pairing rules allow it and none of them depends on an older one in the same group.
+    Fetch offers `issue` instructions at once, the first `n` of which are valid where `n`
+    is the number of low bits set in `fetch_valid`, and `fetch_taken` says how many of them
+    D took. The multiplier is only in the first pipe, which is fine as CO instructions issue
+    alone.
+
+    Results are forwarded from M and W to the operands of X, so the only stall is for an
+    instruction using the result of a load right after it. Otherwise D and X only wait for
+    the data bus to be `ready` for a load or store in X. `cycles`, `retired`, `stalls`
+    (cycles the oldest instruction in D was held for a load), `mem_stalls` (cycles spent
+    waiting for the data bus), `bubbles` (cycles nothing was written back) and `paired`
+    (cycles more than one instruction was) count from reset, so IPC is `retired / cycles`.
+
+    Instructions the decoder doesn't know are dropped.
+    """
+
+    def __init__(self, *, issue=1, rf=RegisterFileSim):
+        self.issue = issue
+        self.rf = rf
+        super().__init__(
+            {
+                "fetch_valid": In(issue),
+                "fetch_insn": In(16 * issue),
+                "fetch_taken": Out(range(issue + 1)),
+                "dbus": Out(DataBus),
+                "t": Out(1),
+                "mach": Out(32),
+                "macl": Out(32),
+                "cycles": Out(32),
+                "retired": Out(32),
+                "stalls": Out(32),
+                "mem_stalls": Out(32),
+                "bubbles": Out(32),
+                "paired": Out(32),
+            }
+        )
+
+    def elaborate(self, platform):
+        m = Module()
+        m.submodules.rf = rf = self.rf(pipes=self.issue)
+        pipes = range(self.issue)
+        suffixes = [str(p) if p else "" for p in pipes]
+
+        # the bits of SR the units use
+        sr_t = Signal()
+        sr_q = Signal()
+        sr_m = Signal()
+
+        # === D ===
+        # a queue of the next `issue` instructions, oldest first, of which `d_count` are
+        # valid. slot `p` is decoded for, and issues down, pipe `p`
+        d_count = Signal(range(self.issue + 1))
+        d_insn = [Signal(16, name=f"d_insn{s}") for s in suffixes]
+        x = [Signal(_Control, name=f"x{s}") for s in suffixes]
+
+        # set while X waits on the data bus, which holds D and X where they are. X's
+        # operands are read again, in case they were being forwarded from M or W
+        hold = Signal()
+
+        decoders = []
+        for p, s in zip(pipes, suffixes):
+            m.submodules[f"decoder{s}"] = decoder = Decoder()
+            read_a = getattr(rf, f"ra{s}")
+            read_b = getattr(rf, f"rb{s}")
+            m.d.comb += [
+                decoder.insn.eq(d_insn[p]),
+                read_a.addr.eq(Mux(hold, x[p].rn, decoder.rn)),
+                read_b.addr.eq(Mux(hold, x[p].rm, decoder.rm)),
+            ]
+            decoders.append(decoder)
+
+        # === D/X ===
+        x_m = [Signal(_Control, name=f"x_m{s}") for s in suffixes]
+        x_m_result = [Signal(32, name=f"x_m_result{s}") for s in suffixes]
+        m_w = [Signal(_Control, name=f"m_w{s}") for s in suffixes]
+        m_w_result = [Signal(32, name=f"m_w_result{s}") for s in suffixes]
+
+        def _reads(decoder, rn):
+            return (decoder.read_rn & (decoder.rn == rn)) | (decoder.read_rm & (decoder.rm == rn))
+
+        # the one hazard forwarding can't cover: a load's data only arrives in M, so
+        # anything using it right after has to wait a cycle in D
+        load_use = []
+        for p, decoder in enumerate(decoders):
+            hazard = Signal(name=f"load_use{suffixes[p]}")
+            m.d.comb += hazard.eq(
+                Cat(
+                    x_q.valid & (x_q.unit == Unit.LOAD) & _reads(decoder, x_q.rn) for x_q in x
+                ).any()
+            )
+            load_use.append(hazard)
+
+        # instructions issue in order, so each one only leaves D if all older ones do. an
+        # instruction the decoder doesn't know never holds anything up
+        issue = []
+        for p, decoder in enumerate(decoders):
+            ok = (d_count > p) & ~(decoder.valid & load_use[p]) & ~hold
+            if p:
+                ok &= issue[p - 1] & ~(decoder.valid & (decoder.group == Group.CO))
+            for older in decoders[:p]:
+                depends = (
+                    (older.write_rn & _reads(decoder, older.rn))
+                    | (older.write_rn & decoder.write_rn & (older.rn == decoder.rn))
+                    | (older.write_t & (decoder.read_t | decoder.write_t))
+                )
+                ok &= ~(older.valid & decoder.valid) | (
+                    _pairs(older.group, decoder.group) & ~depends
+                )
+            issue.append(Signal(name=f"issue{suffixes[p]}"))
+            m.d.comb += issue[p].eq(ok)
+
+        for p, decoder in enumerate(decoders):
+            with m.If(~hold):
+                m.d.sync += [
+                    x[p].valid.eq(issue[p] & decoder.valid),
+                    x[p].unit.eq(decoder.unit),
+                    x[p].sel.eq(decoder.sel),
+                    x[p].rn.eq(decoder.rn),
+                    x[p].rm.eq(decoder.rm),
+                    x[p].read_t.eq(decoder.read_t),
+                    x[p].write_rn.eq(decoder.write_rn),
+                    x[p].write_t.eq(decoder.write_t),
+                ]
+
+        # the instructions left behind move to the front of the queue, and fetch fills in
+        # the rest
+        issued = Signal(range(self.issue + 1))
+        m.d.comb += issued.eq(sum(issue))
+        left = Signal(range(self.issue + 1))
+        m.d.comb += left.eq(d_count - issued)
+
+        fetch_count = Signal(range(self.issue + 1))
+        for p in pipes:
+            with m.If(self.fetch_valid[: p + 1].all()):
+                m.d.comb += fetch_count.eq(p + 1)
+        m.d.comb += self.fetch_taken.eq(
+            Mux(self.issue - left < fetch_count, self.issue - left, fetch_count)
+        )
+
+        queue = Array(d_insn + [self.fetch_insn[16 * p : 16 * (p + 1)] for p in pipes])
+        for p in pipes:
+            m.d.sync += d_insn[p].eq(
+                queue[Mux(p < left, issued + p, self.issue + p - left)]
+            )
+        m.d.sync += d_count.eq(left + self.fetch_taken)
+
+        # === forwarding ===
+        def _forward(addr, rf_data):
+            # the youngest result wins. instructions that issued together never write the
+            # same register, and a load in M can't be forwarded, but is never needed here
+            # thanks to the stall
+            value = Signal(32)
+            m.d.comb += value.eq(rf_data)
+            for stage, result in ((m_w, m_w_result), (x_m, x_m_result)):
+                for control, data in zip(stage, result):
+                    with m.If(control.valid & control.write_rn & (control.rn == addr)):
+                        m.d.comb += value.eq(data)
+            return value
+
+        # === X ===
+        m.submodules.mul = mul = Mul()
+        m.submodules.mem_write = mem_write = MemoryWrite()
+
+        x_result = [Signal(32, name=f"x_result{s}") for s in suffixes]
+        x_addr = [Signal(32, name=f"x_addr{s}") for s in suffixes]
+        for p, s in zip(pipes, suffixes):
+            Rn = _forward(x[p].rn, getattr(rf, f"ra{s}").data)
+            Rm = _forward(x[p].rm, getattr(rf, f"rb{s}").data)
+
+            m.submodules[f"alu{s}"] = alu = Alu()
+            m.submodules[f"cmp{s}"] = cmp = Cmp()
+            m.submodules[f"div{s}"] = div = Div()
+
+            # instructions that don't read T see it clear, which makes ADDC and SUBC into
+            # ADD and SUB
+            x_t = sr_t & x[p].read_t
+            m.d.comb += [
+                alu.sel.eq(x[p].sel),
+                alu.op1.eq(Rn),
+                alu.op2.eq(Rm),
+                alu.t.eq(x_t),
+                cmp.sel.eq(x[p].sel),
+                cmp.op1.eq(Rn),
+                cmp.op2.eq(Rm),
+                div.sel.eq(x[p].sel),
+                div.op1.eq(Rn),
+                div.op2.eq(Rm),
+                div.t.eq(x_t),
+                div.q.eq(sr_q),
+                div.m.eq(sr_m),
+            ]
+            if not p:
+                m.d.comb += [
+                    mul.valid.eq(x[p].valid & (x[p].unit == Unit.MUL) & ~hold),
+                    mul.sel.eq(x[p].sel),
+                    mul.op1.eq(Rn),
+                    mul.op2.eq(Rm),
+                ]
+
+            x_result_t = Signal(name=f"x_result_t{s}")
+            with m.Switch(x[p].unit):
+                with m.Case(Unit.ALU):
+                    m.d.comb += [x_result[p].eq(alu.result), x_result_t.eq(alu.result_t)]
+                with m.Case(Unit.CMP):
+                    m.d.comb += x_result_t.eq(cmp.t)
+                with m.Case(Unit.DIV):
+                    m.d.comb += [x_result[p].eq(div.result), x_result_t.eq(div.result_t)]
+
+            # T, Q and M are only ever written in X, so later instructions always see them
+            # up to date. instructions that issued together never both write them
+            with m.If(x[p].valid & x[p].write_t & ~hold):
+                m.d.sync += sr_t.eq(x_result_t)
+            with m.If(x[p].valid & (x[p].unit == Unit.DIV) & ~hold):
+                m.d.sync += [sr_q.eq(div.result_q), sr_m.eq(div.result_m)]
+
+            # loads read from @Rm, and stores write Rm to @Rn. only one LS instruction
+            # issues at a time, so it has the data bus to itself
+            x_load = x[p].valid & (x[p].unit == Unit.LOAD)
+            x_store = x[p].valid & (x[p].unit == Unit.STORE)
+            m.d.comb += x_addr[p].eq(Mux(x_store, Rn, Rm))
+            with m.If(x_load | x_store):
+                m.d.comb += [
+                    hold.eq(~self.dbus.ready),
+                    mem_write.width.eq(x[p].sel),
+                    mem_write.addr.eq(x_addr[p][0:2]),
+                    mem_write.data.eq(Rm),
+                    self.dbus.addr.eq(x_addr[p]),
+                    self.dbus.re.eq(x_load),
+                    self.dbus.we.eq(x_store),
+                ]
+        m.d.comb += [
+            self.dbus.wstb.eq(mem_write.wstb),
+            self.dbus.wdata.eq(mem_write.wdata),
+        ]
+
+        for p, s in zip(pipes, suffixes):
+            # === X/M ===
+            x_m_addr = Signal(2, name=f"x_m_addr{s}")
+            m.d.sync += [
+                x_m[p].eq(x[p]),
+                x_m_result[p].eq(x_result[p]),
+                x_m_addr.eq(x_addr[p][0:2]),
+            ]
+            with m.If(hold):
+                m.d.sync += x_m[p].valid.eq(0)
+
+            # === M ===
+            m.submodules[f"mem_read{s}"] = mem_read = MemoryRead()
+            m.d.comb += [
+                mem_read.width.eq(x_m[p].sel),
+                mem_read.addr.eq(x_m_addr),
+                mem_read.rdata.eq(self.dbus.rdata),
+            ]
+
+            # === M/W ===
+            m.d.sync += [
+                m_w[p].eq(x_m[p]),
+                m_w_result[p].eq(Mux(x_m[p].unit == Unit.LOAD, mem_read.data, x_m_result[p])),
+            ]
+
+            # === W ===
+            write = getattr(rf, f"rd{s}")
+            m.d.comb += [
+                write.en.eq(m_w[p].valid & m_w[p].write_rn),
+                write.addr.eq(m_w[p].rn),
+                write.data.eq(m_w_result[p]),
+            ]
+
+        # === result ===
+        written = Signal(range(self.issue + 1))
+        m.d.comb += written.eq(sum(m_w[p].valid for p in pipes))
+        m.d.sync += [
+            self.cycles.eq(self.cycles + 1),
+            self.retired.eq(self.retired + written),
+            self.stalls.eq(
+                self.stalls + ((d_count > 0) & decoders[0].valid & load_use[0] & ~hold)
+            ),
+            self.mem_stalls.eq(self.mem_stalls + hold),
+            self.bubbles.eq(self.bubbles + (written == 0)),
+            self.paired.eq(self.paired + (written > 1)),
+        ]
+        m.d.comb += [
+            self.t.eq(sr_t),
+            self.mach.eq(mul.mach),
+            self.macl.eq(mul.macl),
+        ]
+
+        return m
@@ -0,0 +1,195 @@
+from amaranth import Module
+from amaranth.lib.wiring import connect
+from amaranth.sim import Settle, Simulator
+import pytest
+
+from snoot4.be.backend import Backend
+from snoot4.fe.decode import OPCODES
+from snoot4.mem.dcache import DCache
+from snoot4.mem.model import burst_memory
+from snoot4.rf.mem import RegisterFileMem
+from snoot4.rf.sim import RegisterFileSim
+
+_ENCODINGS = {mnemonic: encoding for mnemonic, encoding, *_ in OPCODES}
+
+
+def encode(mnemonic, n=0, m=0):
+    encoding = _ENCODINGS[mnemonic]
+    encoding = encoding.replace("nnnn", f"{n:04b}").replace("mmmm", f"{m:04b}")
+    return int(encoding, 2)
+
+
+def run(program, memory, *, issue=1, rf=RegisterFileSim, dcache=None):
+    """
+    Run `program` on a `Backend` until it's drained, with `memory` (a dict of big endian
+    words by address) on its data bus, behind `dcache` if given. Returns the counters at the
+    end.
+    """
+    dut = Backend(issue=issue, rf=rf)
+    counters = {}
+
+    def bench():
+        pc = 0
+        read = None
+        for _ in range(len(program) * 64 + 64):
+            window = program[pc : pc + issue]
+            yield dut.fetch_valid.eq((1 << len(window)) - 1)
+            yield dut.fetch_insn.eq(sum(insn << (16 * i) for i, insn in enumerate(window)))
+            if dcache is None:
+                yield dut.dbus.ready.eq(1)
+            yield Settle()
+            if (yield dut.retired) == len(program):
+                break
+
+            taken = yield dut.fetch_taken
+            if dcache is None:
+                addr = (yield dut.dbus.addr) & ~3
+                if (yield dut.dbus.we):
+                    wstb, wdata = (yield dut.dbus.wstb), (yield dut.dbus.wdata)
+                    word = memory.get(addr, 0)
+                    for lane in range(4):
+                        if (wstb >> lane) & 1:
+                            mask = 0xFF << (lane * 8)
+                            word = (word & ~mask) | (wdata & mask)
+                    memory[addr] = word
+                next_read = addr if (yield dut.dbus.re) else None
+
+            yield
+            pc += taken
+            if dcache is None:
+                read = next_read
+                yield dut.dbus.rdata.eq(memory.get(read, 0) if read is not None else 0)
+
+        for counter in ["cycles", "retired", "stalls", "mem_stalls", "bubbles", "paired"]:
+            counters[counter] = yield getattr(dut, counter)
+        for register in ["t", "mach", "macl"]:
+            counters[register] = yield getattr(dut, register)
+
+    if dcache is None:
+        sim = Simulator(dut)
+    else:
+        m = Module()
+        m.submodules.backend = dut
+        m.submodules.dcache = dcache
+        connect(m, dut.dbus, dcache.cpu)
+        sim = Simulator(m)
+        sim.add_sync_process(burst_memory(dcache.mem, memory, latency=4))
+    sim.add_clock(1e-6)
+    sim.add_sync_process(bench)
+    sim.run()
+    return counters
+
+
+@pytest.mark.parametrize("issue", [1, 2])
+@pytest.mark.parametrize("rf", [RegisterFileSim, RegisterFileMem])
+def test_forwarding(rf, issue):
+    # R0 is the only register known at reset (0), everything else is loaded from there
+    memory = {0x0: 0x40}
+    program = [
+        encode("MOV.L @Rm,Rn", n=1, m=0),  # R1 = 0x40
+        encode("MOV.L @Rm,Rn", n=2, m=0),  # R2 = 0x40
+        encode("ADD", n=2, m=2),  # R2 = 0x80 (R2 from W, after waiting for the load)
+        encode("ADD", n=2, m=2),  # R2 = 0x100 (R2 from M)
+        encode("SUB", n=2, m=1),  # R2 = 0xC0 (R2 from M, R1 from the register file)
+        encode("MOV.L Rm,@Rn", n=1, m=2),  # [0x40] = 0xC0
+        encode("SHLL2", n=2),  # R2 = 0x300
+        encode("CMP/HS", n=2, m=1),  # T = 1
+        encode("ADDC", n=2, m=1),  # R2 = 0x341
+        encode("MOV.W Rm,@Rn", n=1, m=2),  # [0x40] = 0x034100C0
+    ]
+
+    counters = run(program, memory, issue=issue, rf=rf)
+    assert memory[0x40] == 0x034100C0
+    assert counters["retired"] == len(program)
+    assert counters["stalls"] == 1
+
+
+# with two pipes the XOR issues alongside the load of R3, so the ADD needs to wait for it
+@pytest.mark.parametrize("issue,stalls", [(1, 1), (2, 2)])
+def test_load_use(issue, stalls):
+    memory = {0x0: 0x10, 0x10: 0x20}
+    program = [
+        encode("MOV.L @Rm,Rn", n=1, m=0),  # R1 = 0x10
+        encode("MOV.L @Rm,Rn", n=2, m=1),  # R2 = 0x20, has to wait for R1
+        encode("MOV.L @Rm,Rn", n=3, m=0),  # R3 = 0x10
+        encode("XOR", n=4, m=4),  # independent of R3, so doesn't wait
+        encode("ADD", n=3, m=2),  # R3 = 0x30, R3 forwarded from W
+        encode("MOV.L Rm,@Rn", n=1, m=3),  # [0x10] = 0x30
+    ]
+
+    counters = run(program, memory, issue=issue)
+    assert memory[0x10] == 0x30
+    assert counters["retired"] == len(program)
+    assert counters["stalls"] == stalls
+
+
+def test_ipc():
+    # independent instructions issue one per cycle: the only cycles without an instruction
+    # written back are the four it takes to fill the pipeline, and the ones after it's drained
+    program = [encode("ADD", n=n % 8, m=n % 8) for n in range(32)]
+
+    counters = run(program, {})
+    assert counters["retired"] == len(program)
+    assert counters["stalls"] == 0
+    assert counters["bubbles"] == counters["cycles"] - len(program)
+
+
+def test_dual_issue():
+    memory = {0x0: 0x10}
+    program = [
+        encode("MOV.L @Rm,Rn", n=1, m=0),  # LS: R1 = 0x10
+        encode("XOR", n=2, m=2),  # EX: R2 = 0, pairs with the load
+        encode("ADD", n=2, m=1),  # EX: R2 = 0x10, waits for the load
+        encode("AND", n=5, m=5),  # EX: doesn't pair with the ADD
+        encode("MUL.L", n=1, m=2),  # CO: issues alone
+        encode("CMP/EQ", n=1, m=1),  # MT: T = 1
+        encode("ADDC", n=2, m=0),  # EX: R2 = 0x11, doesn't pair as it reads T
+        encode("MOV.L Rm,@Rn", n=1, m=2),  # LS: [0x10] = 0x11, doesn't pair as it reads R2
+        encode("OR", n=4, m=4),  # EX: pairs with the store
+        encode("MOV.L Rm,@Rn", n=0, m=2),  # LS: [0x0] = 0x11
+    ]
+
+    counters = run(program, memory, issue=2)
+    assert memory == {0x0: 0x11, 0x10: 0x11}
+    assert counters["retired"] == len(program)
+    assert counters["stalls"] == 1
+    assert counters["paired"] == 2
+
+
+def test_dual_issue_ipc():
+    # alternating MT and EX instructions with no dependencies all issue in pairs
+    program = []
+    for n in range(16):
+        program += [encode("CMP/EQ", n=n % 8, m=n % 8), encode("ADD", n=n % 8, m=n % 8)]
+
+    counters = run(program, {}, issue=2)
+    assert counters["retired"] == len(program)
+    assert counters["paired"] == len(program) // 2
+    assert counters["bubbles"] == counters["cycles"] - len(program) // 2
+
+
+@pytest.mark.parametrize("issue", [1, 2])
+def test_dcache(issue):
+    # the same as test_forwarding, but behind a cache that keeps the stores to itself, so
+    # the result is loaded back and multiplied out instead
+    memory = {0x0: 0x40}
+    program = [
+        encode("MOV.L @Rm,Rn", n=1, m=0),  # R1 = 0x40
+        encode("MOV.L @Rm,Rn", n=2, m=0),  # R2 = 0x40
+        encode("ADD", n=2, m=2),  # R2 = 0x80
+        encode("ADD", n=2, m=2),  # R2 = 0x100
+        encode("SUB", n=2, m=1),  # R2 = 0xC0
+        encode("MOV.L Rm,@Rn", n=1, m=2),  # [0x40] = 0xC0, a miss
+        encode("SHLL2", n=2),  # R2 = 0x300
+        encode("CMP/HS", n=2, m=1),  # T = 1
+        encode("ADDC", n=2, m=1),  # R2 = 0x341
+        encode("MOV.W Rm,@Rn", n=1, m=2),  # [0x40] = 0x034100C0, a hit
+        encode("MOV.L @Rm,Rn", n=3, m=1),  # R3 = 0x034100C0
+        encode("DMULU.L", n=3, m=1),  # MACH:MACL = R3 * 0x40
+    ]
+
+    dcache = DCache(size=256, line=16, ways=2)
+    counters = run(program, memory, issue=issue, dcache=dcache)
+    assert counters["retired"] == len(program)
+    assert counters["mem_stalls"] > 0
+    assert (counters["mach"] << 32 | counters["macl"]) == 0x034100C0 * 0x40
@@ -1,3 +1,6 @@
 from snoot4.be.units.alu import Alu
+from snoot4.be.units.alucmp import AluCmp
 from snoot4.be.units.cmp import Cmp
+from snoot4.be.units.div import Div
 from snoot4.be.units.mem import MemoryRead, MemoryWrite
+from snoot4.be.units.mul import Mul
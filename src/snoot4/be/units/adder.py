@@ -0,0 +1,129 @@
+from amaranth import Cat, Module, Mux, Signal
+from amaranth.lib import enum
+from amaranth.lib.wiring import Component, In, Out
+
+
+class Adder(Component):
+    """
+    `a + b + carry_in`, built with the adder architecture `arch`.
+    """
+
+    class Arch(enum.Enum):
+        # whatever the synthesis tool infers for `+`, usually the FPGA's carry chain
+        RIPPLE = "ripple"
+        # parallel prefix adders: log2(width) levels of carry logic
+        KOGGE_STONE = "kogge-stone"
+        BRENT_KUNG = "brent-kung"
+        # blocks of `_BLOCK` bits, each added for both carry-ins ahead of time
+        CARRY_SELECT = "carry-select"
+
+    _BLOCK = 8
+
+    def __init__(self, width=32, arch=Arch.RIPPLE):
+        self.width = width
+        self.arch = Adder.Arch(arch)
+        super().__init__(
+            {
+                "a": In(width),
+                "b": In(width),
+                "carry_in": In(1),
+                "sum": Out(width),
+                "carry_out": Out(1),
+            }
+        )
+
+    def elaborate(self, platform):
+        m = Module()
+
+        if self.arch == Adder.Arch.RIPPLE:
+            m.d.comb += Cat(self.sum, self.carry_out).eq(self.a + self.b + self.carry_in)
+        elif self.arch == Adder.Arch.CARRY_SELECT:
+            self._elaborateCarrySelect(m)
+        else:
+            self._elaboratePrefix(m)
+
+        return m
+
+    def _elaboratePrefix(self, m):
+        # === generate and propagate ===
+        p = Signal(self.width)
+        g = Signal(self.width)
+        m.d.comb += [
+            p.eq(self.a ^ self.b),
+            g.eq(self.a & self.b),
+        ]
+
+        # (generate, propagate) of bits 0 to i, with the carry-in folded into bit 0
+        prefix = [(g[i], p[i]) for i in range(self.width)]
+        prefix[0] = (g[0] | (p[0] & self.carry_in), p[0])
+
+        def _combine(high, low):
+            (g_high, p_high), (g_low, p_low) = high, low
+
+            # each node drives several others, so it needs to be a signal of its own to not
+            # be duplicated into every one of them
+            g, p = Signal(), Signal()
+            m.d.comb += [
+                g.eq(g_high | (p_high & g_low)),
+                p.eq(p_high & p_low),
+            ]
+            return g, p
+
+        # === prefix network ===
+        if self.arch == Adder.Arch.KOGGE_STONE:
+            distance = 1
+            while distance < self.width:
+                prefix = [
+                    _combine(prefix[i], prefix[i - distance]) if i >= distance else prefix[i]
+                    for i in range(self.width)
+                ]
+                distance *= 2
+        else:  # Adder.Arch.BRENT_KUNG
+            # up the tree: bit i covers the 2 * distance bits ending at it
+            distance = 1
+            while distance < self.width:
+                for i in range(2 * distance - 1, self.width, 2 * distance):
+                    prefix[i] = _combine(prefix[i], prefix[i - distance])
+                distance *= 2
+            # and back down, to fill in the bits in between
+            while distance > 1:
+                distance //= 2
+                for i in range(3 * distance - 1, self.width, 2 * distance):
+                    prefix[i] = _combine(prefix[i], prefix[i - distance])
+
+        # === sum ===
+        carries = Signal(self.width + 1)
+        m.d.comb += carries.eq(Cat(self.carry_in, *(g for g, _ in prefix)))
+        m.d.comb += [
+            self.sum.eq(p ^ carries[: self.width]),
+            self.carry_out.eq(carries[self.width]),
+        ]
+
+    def _elaborateCarrySelect(self, m):
+        carry = self.carry_in
+        sums = []
+        for start in range(0, self.width, Adder._BLOCK):
+            a = self.a[start : start + Adder._BLOCK]
+            b = self.b[start : start + Adder._BLOCK]
+
+            # the first block knows its carry-in already
+            if start == 0:
+                block = Signal(len(a) + 1, name=f"block{start}")
+                m.d.comb += block.eq(a + b + carry)
+            else:
+                block_0 = Signal(len(a) + 1, name=f"block{start}_0")
+                block_1 = Signal(len(a) + 1, name=f"block{start}_1")
+                block = Signal(len(a) + 1, name=f"block{start}")
+                m.d.comb += [
+                    block_0.eq(a + b),
+                    block_1.eq(a + b + 1),
+                    block.eq(Mux(carry, block_1, block_0)),
+                ]
+
+            sums.append(block[:-1])
+            carry = block[-1]
+
+        m.d.comb += [
+            self.sum.eq(Cat(*sums)),
+            self.carry_out.eq(carry),
+        ]
@@ -0,0 +1,37 @@
+from amaranth import Cat
+import pytest
+
+from amaranth.hdl.dsl import Assert
+
+from snoot4.be.units.adder import Adder
+from snoot4.tests.utils import Spec, assertFormal
+
+
+class _AdderSpec:
+    def spec(self, m, gate):
+        gold_sum = gate.a + gate.b + gate.carry_in
+
+        m.d.comb += Assert(Cat(gate.sum, gate.carry_out) == gold_sum)
+
+
+class RippleSpec(_AdderSpec, Spec(Adder, arch=Adder.Arch.RIPPLE)):
+    pass
+
+
+class KoggeStoneSpec(_AdderSpec, Spec(Adder, arch=Adder.Arch.KOGGE_STONE)):
+    pass
+
+
+class BrentKungSpec(_AdderSpec, Spec(Adder, arch=Adder.Arch.BRENT_KUNG)):
+    pass
+
+
+class CarrySelectSpec(_AdderSpec, Spec(Adder, arch=Adder.Arch.CARRY_SELECT)):
+    pass
+
+
+@pytest.mark.parametrize(
+    "spec", [RippleSpec, KoggeStoneSpec, BrentKungSpec, CarrySelectSpec]
+)
+def test_adder(spec, tmp_path):
+    assertFormal(spec(), tmp_path)
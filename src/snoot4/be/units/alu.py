@@ -1,7 +1,9 @@
-from amaranth import Cat, Module, Mux, Signal, Value
+from amaranth import C, Cat, Module, Mux, Shape, Signal
 from amaranth.lib import enum
 from amaranth.lib.wiring import Component, In, Out
 
+from snoot4.be.units.adder import Adder
+
 
 class _AluReg:
     op1: In(32)
@@ -14,70 +16,6 @@ class _AluT:
     result_t: Out(1)
 
 
-_L = 2
-_ADD = 0b00 << _L
-_LOGIC = 0b01 << _L
-_EXTEND = 0b10 << _L
-_SWAP = 0b11 << _L
-
-
-class Alu(_AluReg, _AluT, Component):
-    class Sel(enum.Enum):
-        # TODO: can we automatically generate this from the unit selector enums?
-        ADDV = _ADD | 0b00
-        ADDC = _ADD | 0b01
-        SUBV = _ADD | 0b10
-        SUBC = _ADD | 0b11
-
-        NOT = _LOGIC | 0b00
-        AND = _LOGIC | 0b01
-        XOR = _LOGIC | 0b10
-        OR = _LOGIC | 0b11
-
-        EXTUB = _EXTEND | 0b00
-        EXTUW = _EXTEND | 0b01
-        EXTSB = _EXTEND | 0b10
-        EXTSW = _EXTEND | 0b11
-
-        SWAPB = _SWAP | 0b00
-        SWAPW = _SWAP | 0b01
-        XTRCT = _SWAP | 0b10
-
-    sel: In(Sel)
-
-    def elaborate(self, platform):
-        m = Module()
-        m.submodules.add = add = AluAdd()
-        m.submodules.logic = logic = AluLogic()
-        m.submodules.extend = extend = AluExtend()
-        m.submodules.swap = swap = AluSwap()
-
-        units = [
-            (_ADD, add),
-            (_LOGIC, logic),
-            (_EXTEND, extend),
-            (_SWAP, swap),
-        ]
-
-        for unit_sel, unit in units:
-            # === drive inputs ===
-            m.d.comb += [
-                unit.sel.eq(self.sel),
-                unit.op1.eq(self.op1),
-                unit.op2.eq(self.op2),
-            ]
-            if isinstance(unit, _AluT):
-                m.d.comb += unit.t.eq(self.t)
-
-            # === select result ===
-            with m.If(self.sel[_L:] == Value.cast(unit_sel)[_L:]):
-                m.d.comb += self.result.eq(unit.result)
-                if isinstance(unit, _AluT):
-                    m.d.comb += self.result_t.eq(unit.result_t)
-
-        return m
-
-
 class AluAdd(_AluReg, _AluT, Component):
     class Sel(enum.Enum):
         ADDV = 0b00
@@ -87,6 +25,10 @@ class AluAdd(_AluReg, _AluT, Component):
 
     sel: In(Sel)
 
+    def __init__(self, *, adder=Adder.Arch.RIPPLE):
+        self.adder = adder
+        super().__init__()
+
     def elaborate(self, platform):
         m = Module()
 
@@ -109,14 +51,19 @@ class AluAdd(_AluReg, _AluT, Component):
         ]
 
         # === adder ===
+        m.submodules.adder = adder = Adder(32, self.adder)
         add1_sign = Signal()
         add2_sign = Signal()
         r_add = Signal(32)
         r_add_sign = Signal()
         m.d.comb += [
+            adder.a.eq(add1),
+            adder.b.eq(add2),
+            adder.carry_in.eq(carry),
             add1_sign.eq(add1[31]),
             add2_sign.eq(add2[31]),
-            Cat(r_add, r_add_sign).eq(add1 + add2 + carry),
+            r_add.eq(adder.sum),
+            r_add_sign.eq(adder.carry_out),
         ]
 
         # === flags ===
@@ -245,3 +192,171 @@ class AluSwap(_AluReg, Component):
         m.d.comb += self.result.eq(Mux(sel_swap, r_swap, r_xtrct))
 
         return m
+
+
+class AluShift(_AluReg, _AluT, Component):
+    class Sel(enum.Enum):
+        SHLL = 0b0000
+        SHLR = 0b0001
+        SHAL = 0b0010
+        SHAR = 0b0011
+        ROTL = 0b0100
+        ROTR = 0b0101
+        ROTCL = 0b0110
+        ROTCR = 0b0111
+        SHLL2 = 0b1000
+        SHLR2 = 0b1001
+        SHLL8 = 0b1010
+        SHLR8 = 0b1011
+        SHLL16 = 0b1100
+        SHLR16 = 0b1101
+        SHAD = 0b1110
+        SHLD = 0b1111
+
+    sel: In(Sel)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        # every operation is a right shift of `Cat(low, high)` by `amount`, keeping the low
+        # 32 bits. shifting left by n is the same as shifting `Cat(0, op1)` right by 32 - n,
+        # and rotating is shifting `Cat(op1, op1)`
+        Rn = self.op1
+        high = Signal(32)
+        low = Signal(32)
+        amount = Signal(range(33))
+
+        def _left(n):
+            m.d.comb += [high.eq(Rn), low.eq(0), amount.eq(32 - n)]
+
+        def _right(n, fill):
+            m.d.comb += [high.eq(fill.replicate(32)), low.eq(Rn), amount.eq(n)]
+
+        # === selector decode ===
+        sign = Rn[31]
+        with m.Switch(self.sel):
+            with m.Case(AluShift.Sel.SHLL, AluShift.Sel.SHAL):
+                _left(1)
+            with m.Case(AluShift.Sel.SHLR):
+                _right(1, C(0))
+            with m.Case(AluShift.Sel.SHAR):
+                _right(1, sign)
+            with m.Case(AluShift.Sel.ROTL):
+                m.d.comb += [high.eq(Rn), low.eq(Rn), amount.eq(31)]
+            with m.Case(AluShift.Sel.ROTR):
+                m.d.comb += [high.eq(Rn), low.eq(Rn), amount.eq(1)]
+            with m.Case(AluShift.Sel.ROTCL):
+                m.d.comb += [high.eq(Rn), low.eq(Cat(C(0, 31), self.t)), amount.eq(31)]
+            with m.Case(AluShift.Sel.ROTCR):
+                m.d.comb += [high.eq(self.t), low.eq(Rn), amount.eq(1)]
+            with m.Case(AluShift.Sel.SHLL2):
+                _left(2)
+            with m.Case(AluShift.Sel.SHLR2):
+                _right(2, C(0))
+            with m.Case(AluShift.Sel.SHLL8):
+                _left(8)
+            with m.Case(AluShift.Sel.SHLR8):
+                _right(8, C(0))
+            with m.Case(AluShift.Sel.SHLL16):
+                _left(16)
+            with m.Case(AluShift.Sel.SHLR16):
+                _right(16, C(0))
+            with m.Case(AluShift.Sel.SHAD, AluShift.Sel.SHLD):
+                # Rm >= 0 shifts left by Rm[0:5]. Rm < 0 shifts right by 32 - Rm[0:5], so
+                # by 32 (shifting everything out) when Rm[0:5] == 0. both are by
+                # 32 - Rm[0:5] as a right shift
+                Rm = self.op2
+                arithmetic = self.sel == AluShift.Sel.SHAD
+                with m.If(Rm[31]):
+                    m.d.comb += high.eq((arithmetic & sign).replicate(32)), low.eq(Rn)
+                with m.Else():
+                    m.d.comb += high.eq(Rn), low.eq(0)
+                m.d.comb += amount.eq(32 - Rm[0:5])
+
+        # === shifter ===
+        # one stage per bit of `amount`, largest first, each either shifting by its power
+        # of two or not. only the bits that the later stages can still shift into the low
+        # 32 are kept
+        stage = Cat(low, high)
+        for i in reversed(range(len(amount))):
+            shifted = Signal(32 + (1 << i) - 1, name=f"stage{i}")
+            m.d.comb += shifted.eq(Mux(amount[i], stage[1 << i :], stage[: len(shifted)]))
+            stage = shifted
+
+        # === flags ===
+        # shifts by one shift out the most or least significant bit into T, while the
+        # others leave T alone
+        t = Signal()
+        with m.Switch(self.sel):
+            with m.Case(
+                AluShift.Sel.SHLL, AluShift.Sel.SHAL, AluShift.Sel.ROTL, AluShift.Sel.ROTCL
+            ):
+                m.d.comb += t.eq(Rn[31])
+            with m.Case(
+                AluShift.Sel.SHLR, AluShift.Sel.SHAR, AluShift.Sel.ROTR, AluShift.Sel.ROTCR
+            ):
+                m.d.comb += t.eq(Rn[0])
+            with m.Default():
+                m.d.comb += t.eq(self.t)
+
+        # === result ===
+        m.d.comb += [
+            self.result.eq(stage[0:32]),
+            self.result_t.eq(t),
+        ]
+
+        return m
+
+
+# the units the ALU selects between, in the order of their index in `Alu.Sel`
+_UNITS = [AluAdd, AluLogic, AluExtend, AluSwap, AluShift]
+
+# `Alu.Sel` is the unit's index above the `_L` bits of the unit's own selector
+_L = max(Shape.cast(unit.Sel).width for unit in _UNITS)
+
+
+def _aluSel():
+    members = {}
+    for index, unit in enumerate(_UNITS):
+        for member in unit.Sel:
+            members[member.name] = index << _L | member.value
+    return enum.Enum("Sel", members, module=__name__, qualname="Alu.Sel")
+
+
+class Alu(_AluReg, _AluT, Component):
+    Sel = _aluSel()
+
+    sel: In(Sel)
+
+    def __init__(self, *, adder=Adder.Arch.RIPPLE):
+        self.adder = adder
+        super().__init__()
+
+    def elaborate(self, platform):
+        m = Module()
+
+        for index, unit_cls in enumerate(_UNITS):
+            if unit_cls is AluAdd:
+                unit = AluAdd(adder=self.adder)
+            else:
+                unit = unit_cls()
+            m.submodules[unit_cls.__name__.removeprefix("Alu").lower()] = unit
+
+            # === drive inputs ===
+            m.d.comb += [
+                unit.sel.eq(self.sel),
+                unit.op1.eq(self.op1),
+                unit.op2.eq(self.op2),
+            ]
+            if isinstance(unit, _AluT):
+                m.d.comb += unit.t.eq(self.t)
+
+            # === select result ===
+            with m.If(self.sel[_L:] == index):
+                m.d.comb += self.result.eq(unit.result)
+                if isinstance(unit, _AluT):
+                    m.d.comb += self.result_t.eq(unit.result_t)
+
+        return m
+
+
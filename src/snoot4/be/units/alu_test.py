@@ -201,6 +201,85 @@ class XtrctSpec(AluSpec):
         ]
 
 
+
+def _fixedShiftSpec(name, sel, gold_result, gold_result_t=None):
+    def spec(self, m, gate):
+        Rn, T = gate.op1, gate.t
+
+        m.d.comb += [
+            Assume(gate.sel == sel),
+            Assert(gate.result == (gold_result(Rn, T) & 0xFFFFFFFF)),
+            Assert(gate.result_t == (T if gold_result_t is None else gold_result_t(Rn, T))),
+        ]
+
+    return type(name, (AluSpec,), {"spec": spec})
+
+
+# based on software manual: T takes the bit shifted out, if only one is
+ShllSpec = _fixedShiftSpec("ShllSpec", Alu.Sel.SHLL, lambda Rn, T: Rn << 1, lambda Rn, T: Rn[31])
+ShlrSpec = _fixedShiftSpec("ShlrSpec", Alu.Sel.SHLR, lambda Rn, T: Rn >> 1, lambda Rn, T: Rn[0])
+ShalSpec = _fixedShiftSpec("ShalSpec", Alu.Sel.SHAL, lambda Rn, T: Rn << 1, lambda Rn, T: Rn[31])
+SharSpec = _fixedShiftSpec(
+    "SharSpec", Alu.Sel.SHAR, lambda Rn, T: Rn.as_signed() >> 1, lambda Rn, T: Rn[0]
+)
+RotlSpec = _fixedShiftSpec(
+    "RotlSpec", Alu.Sel.ROTL, lambda Rn, T: Rn.rotate_left(1), lambda Rn, T: Rn[31]
+)
+RotrSpec = _fixedShiftSpec(
+    "RotrSpec", Alu.Sel.ROTR, lambda Rn, T: Rn.rotate_right(1), lambda Rn, T: Rn[0]
+)
+RotclSpec = _fixedShiftSpec(
+    "RotclSpec", Alu.Sel.ROTCL, lambda Rn, T: (Rn << 1) | T, lambda Rn, T: Rn[31]
+)
+RotcrSpec = _fixedShiftSpec(
+    "RotcrSpec", Alu.Sel.ROTCR, lambda Rn, T: (Rn >> 1) | (T << 31), lambda Rn, T: Rn[0]
+)
+Shll2Spec = _fixedShiftSpec("Shll2Spec", Alu.Sel.SHLL2, lambda Rn, T: Rn << 2)
+Shlr2Spec = _fixedShiftSpec("Shlr2Spec", Alu.Sel.SHLR2, lambda Rn, T: Rn >> 2)
+Shll8Spec = _fixedShiftSpec("Shll8Spec", Alu.Sel.SHLL8, lambda Rn, T: Rn << 8)
+Shlr8Spec = _fixedShiftSpec("Shlr8Spec", Alu.Sel.SHLR8, lambda Rn, T: Rn >> 8)
+Shll16Spec = _fixedShiftSpec("Shll16Spec", Alu.Sel.SHLL16, lambda Rn, T: Rn << 16)
+Shlr16Spec = _fixedShiftSpec("Shlr16Spec", Alu.Sel.SHLR16, lambda Rn, T: Rn >> 16)
+
+
+class ShadSpec(AluSpec):
+    def spec(self, m, gate):
+        Rn, Rm, T = gate.op1, gate.op2, gate.t
+
+        # based on software manual: negative Rm shifts right by ((~Rm & 0x1F) + 1), which
+        # is 32 and so leaves only the sign when Rm & 0x1F is 0
+        right_amount = ((~Rm & 0x1F) + 1)[0:5]
+        gold_result = Mux(
+            Rm[31] == 0,
+            (Rn << Rm[0:5]) & 0xFFFFFFFF,
+            Mux((Rm & 0x1F) == 0, Mux(Rn[31], 0xFFFFFFFF, 0), Rn.as_signed() >> right_amount),
+        )
+
+        m.d.comb += [
+            Assume(gate.sel == Alu.Sel.SHAD),
+            Assert(gate.result == gold_result[0:32]),
+            Assert(gate.result_t == T),
+        ]
+
+
+class ShldSpec(AluSpec):
+    def spec(self, m, gate):
+        Rn, Rm, T = gate.op1, gate.op2, gate.t
+
+        # based on software manual: as SHAD, but shifting in zeroes
+        right_amount = ((~Rm & 0x1F) + 1)[0:5]
+        gold_result = Mux(
+            Rm[31] == 0,
+            (Rn << Rm[0:5]) & 0xFFFFFFFF,
+            Mux((Rm & 0x1F) == 0, 0, Rn >> right_amount),
+        )
+
+        m.d.comb += [
+            Assume(gate.sel == Alu.Sel.SHLD),
+            Assert(gate.result == gold_result[0:32]),
+            Assert(gate.result_t == T),
+        ]
+
 @pytest.mark.parametrize("spec", AluSpec.specs)
 def test_alu(spec, tmp_path):
     assertFormal(spec(), tmp_path)
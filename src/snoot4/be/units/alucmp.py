@@ -0,0 +1,95 @@
+from amaranth import Module, Mux, Signal
+from amaranth.lib.wiring import In
+
+from snoot4.be.units.alu import Alu
+from snoot4.be.units.cmp import Cmp
+
+
+class AluCmp(Alu):
+    """
+    `Alu` that can also perform the comparisons of `Cmp`, so that an execute stage only
+    needs one adder and one AND/XOR network between them.
+
+    While `cmp` is set, `cmp_sel` selects the comparison instead of `sel` selecting the
+    operation, and its result is output on `result_t`.
+    """
+
+    cmp: In(1)
+    cmp_sel: In(Cmp.Sel)
+
+    def elaborate(self, platform):
+        m = Module()
+        m.submodules.alu = alu = Alu(adder=self.adder)
+
+        # === comparisons through the ALU ===
+        # arithmetic comparisons subtract with SUBC, which with T clear borrows into
+        # result_t. the rest only need the result of AND or XOR
+        alu_sel = Signal(Alu.Sel)
+        with m.If(~self.cmp):
+            m.d.comb += alu_sel.eq(self.sel)
+        with m.Elif(self.cmp_sel == Cmp.Sel.TST):
+            m.d.comb += alu_sel.eq(Alu.Sel.AND)
+        with m.Elif(self.cmp_sel == Cmp.Sel.STR):
+            m.d.comb += alu_sel.eq(Alu.Sel.XOR)
+        with m.Else():
+            m.d.comb += alu_sel.eq(Alu.Sel.SUBC)
+
+        m.d.comb += [
+            alu.sel.eq(alu_sel),
+            alu.op1.eq(self.op1),
+            alu.op2.eq(self.op2),
+            alu.t.eq(self.t & ~self.cmp),
+        ]
+
+        # === flags ===
+        r_zero = Signal()
+        r_borrow = Signal()
+        m.d.comb += [
+            r_zero.eq(alu.result == 0),
+            r_borrow.eq(alu.result_t),
+        ]
+
+        t_hs = Signal()
+        t_ge = Signal()
+        t_str = Signal()
+        m.d.comb += [
+            t_hs.eq(~r_borrow),
+            t_ge.eq(~r_borrow ^ self.op1[31] ^ self.op2[31]),
+            t_str.eq(
+                (alu.result[0:8] == 0)
+                | (alu.result[8:16] == 0)
+                | (alu.result[16:24] == 0)
+                | (alu.result[24:32] == 0)
+            ),
+        ]
+
+        t_cmp = Signal()
+        with m.Switch(self.cmp_sel):
+            with m.Case(Cmp.Sel.EQ):
+                m.d.comb += t_cmp.eq(r_zero)
+
+            with m.Case(Cmp.Sel.HS):
+                m.d.comb += t_cmp.eq(t_hs)
+            with m.Case(Cmp.Sel.HI):
+                m.d.comb += t_cmp.eq(t_hs & ~r_zero)
+            with m.Case(Cmp.Sel.GE):
+                m.d.comb += t_cmp.eq(t_ge)
+            with m.Case(Cmp.Sel.GT):
+                m.d.comb += t_cmp.eq(t_ge & ~r_zero)
+
+            with m.Case(Cmp.Sel.CLR):
+                m.d.comb += t_cmp.eq(0)
+            with m.Case(Cmp.Sel.SET):
+                m.d.comb += t_cmp.eq(1)
+            with m.Case(Cmp.Sel.TST):
+                m.d.comb += t_cmp.eq(r_zero)
+            with m.Case(Cmp.Sel.STR):
+                m.d.comb += t_cmp.eq(t_str)
+
+        # === result ===
+        m.d.comb += [
+            self.result.eq(alu.result),
+            self.result_t.eq(Mux(self.cmp, t_cmp, alu.result_t)),
+        ]
+
+        return m
@@ -0,0 +1,65 @@
+from amaranth import Module
+from amaranth.hdl.ast import AnySeq
+import pytest
+
+from snoot4.be.units import Alu, AluCmp, Cmp
+from snoot4.be.units.alu_test import AluSpec
+from snoot4.be.units.cmp_test import CmpSpec
+from snoot4.tests.utils import Spec, assertFormal
+
+
+class _AluView(Alu):
+    def elaborate(self, platform):
+        m = Module()
+        m.submodules.unit = unit = AluCmp()
+
+        m.d.comb += [
+            unit.cmp.eq(0),
+            unit.cmp_sel.eq(AnySeq(len(unit.cmp_sel))),
+            unit.sel.eq(self.sel),
+            unit.op1.eq(self.op1),
+            unit.op2.eq(self.op2),
+            unit.t.eq(self.t),
+            self.result.eq(unit.result),
+            self.result_t.eq(unit.result_t),
+        ]
+
+        return m
+
+
+class _CmpView(Cmp):
+    def elaborate(self, platform):
+        m = Module()
+        m.submodules.unit = unit = AluCmp()
+
+        m.d.comb += [
+            unit.cmp.eq(1),
+            unit.cmp_sel.eq(self.sel),
+            unit.sel.eq(AnySeq(len(unit.sel))),
+            unit.op1.eq(self.op1),
+            unit.op2.eq(self.op2),
+            unit.t.eq(AnySeq(1)),
+            self.t.eq(unit.result_t),
+        ]
+
+        return m
+
+
+AluViewSpec = Spec(_AluView)
+CmpViewSpec = Spec(_CmpView)
+
+# every spec of Alu and Cmp must still hold for AluCmp
+for spec in AluSpec.specs:
+    type(spec.__name__, (AluViewSpec,), {"spec": spec.spec})
+for spec in CmpSpec.specs:
+    type(spec.__name__, (CmpViewSpec,), {"spec": spec.spec})
+
+
+@pytest.mark.parametrize("spec", AluViewSpec.specs)
+def test_alu_view(spec, tmp_path):
+    assertFormal(spec(), tmp_path)
+
+
+@pytest.mark.parametrize("spec", CmpViewSpec.specs)
+def test_cmp_view(spec, tmp_path):
+    assertFormal(spec(), tmp_path)
@@ -1,7 +1,9 @@
-from amaranth import Cat, Module, Signal
+from amaranth import Module, Signal
 from amaranth.lib import enum
 from amaranth.lib.wiring import Component, In, Out
 
+from snoot4.be.units.adder import Adder
+
 
 class Cmp(Component):
     class Sel(enum.Enum):
@@ -24,6 +26,10 @@ class Cmp(Component):
 
     t: Out(1)
 
+    def __init__(self, *, adder=Adder.Arch.RIPPLE):
+        self.adder = adder
+        super().__init__()
+
     def elaborate(self, platform):
         m = Module()
 
@@ -34,12 +40,21 @@ class Cmp(Component):
             op2_sign.eq(self.op2[31]),
         ]
 
+        # op1 - op2 = op1 + ~op2 + 1, which carries out unless it borrows
+        m.submodules.adder = adder = Adder(32, self.adder)
+        m.d.comb += [
+            adder.a.eq(self.op1),
+            adder.b.eq(~self.op2),
+            adder.carry_in.eq(1),
+        ]
+
         r_sub = Signal(32)
         r_sub_sign = Signal()
         r_and = Signal(32)
         r_xor = Signal(32)
         m.d.comb += [
-            Cat(r_sub, r_sub_sign).eq(self.op1 - self.op2),
+            r_sub.eq(adder.sum),
+            r_sub_sign.eq(~adder.carry_out),
             r_and.eq(self.op1 & self.op2),
             r_xor.eq(self.op1 ^ self.op2),
         ]
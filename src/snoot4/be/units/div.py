@@ -0,0 +1,108 @@
+from amaranth import Cat, Module, Signal
+from amaranth.lib import enum
+from amaranth.lib.wiring import Component, In, Out
+
+
+class Div(Component):
+    """
+    Division steps: DIV0S and DIV0U set up the Q, M and T bits, and each DIV1 produces one
+    bit of the quotient.
+
+    With `steps` above 1, DIV1 can also perform a run of up to `steps` DIV1 (with the same
+    operands) in one cycle, `count` giving how many. Each step's `op1` and `t` come from
+    the result of the previous one.
+    """
+
+    class Sel(enum.Enum):
+        DIV0S = 0b00
+        DIV0U = 0b01
+        DIV1 = 0b10
+
+    def __init__(self, *, steps=1):
+        if steps < 1:
+            raise ValueError(f"steps must be at least 1, not {steps}")
+        self.steps = steps
+
+        # the ports of _AluReg and _AluT, plus the Q and M bits and the number of steps
+        super().__init__(
+            {
+                "sel": In(Div.Sel),
+                "count": In(range(1, steps + 1)),
+                "op1": In(32),
+                "op2": In(32),
+                "t": In(1),
+                "q": In(1),
+                "m": In(1),
+                "result": Out(32),
+                "result_t": Out(1),
+                "result_q": Out(1),
+                "result_m": Out(1),
+            }
+        )
+
+    def elaborate(self, platform):
+        m = Module()
+
+        # === DIV1 ===
+        def _step(n, Rn, T, Q):
+            # shift the next bit of the dividend in, and subtract the divisor if the
+            # partial remainder has the same sign as it, or add it otherwise
+            Rm, M = self.op2, self.m
+            shifted = Cat(T, Rn[0:31])
+            step = Signal(33, name=f"step{n}")
+            with m.If(Q == M):
+                m.d.comb += step.eq(shifted - Rm)
+            with m.Else():
+                m.d.comb += step.eq(shifted + Rm)
+
+            # the new Q is the bit shifted out of Rn, corrected by the carry or borrow out
+            result = step[0:32]
+            result_q = Signal(name=f"q{n}")
+            result_t = Signal(name=f"t{n}")
+            m.d.comb += [
+                result_q.eq(Rn[31] ^ step[32] ^ M),
+                result_t.eq(result_q == M),
+            ]
+            return result, result_t, result_q
+
+        div1_result = Signal(32)
+        div1_t = Signal()
+        div1_q = Signal()
+
+        Rn, T, Q = self.op1, self.t, self.q
+        steps = []
+        for n in range(self.steps):
+            Rn, T, Q = _step(n, Rn, T, Q)
+            steps.append((Rn, T, Q))
+
+        # a count out of range performs as many steps as there are
+        with m.Switch(self.count):
+            for n, (Rn, T, Q) in enumerate(steps):
+                with m.Case(n + 1) if n + 1 < self.steps else m.Default():
+                    m.d.comb += [div1_result.eq(Rn), div1_t.eq(T), div1_q.eq(Q)]
+
+        # === result ===
+        with m.Switch(self.sel):
+            with m.Case(Div.Sel.DIV0S):
+                m.d.comb += [
+                    self.result.eq(self.op1),
+                    self.result_q.eq(self.op1[31]),
+                    self.result_m.eq(self.op2[31]),
+                    self.result_t.eq(self.op1[31] ^ self.op2[31]),
+                ]
+            with m.Case(Div.Sel.DIV0U):
+                m.d.comb += [
+                    self.result.eq(self.op1),
+                    self.result_q.eq(0),
+                    self.result_m.eq(0),
+                    self.result_t.eq(0),
+                ]
+            with m.Case(Div.Sel.DIV1):
+                m.d.comb += [
+                    self.result.eq(div1_result),
+                    self.result_t.eq(div1_t),
+                    self.result_q.eq(div1_q),
+                    self.result_m.eq(self.m),
+                ]
+
+        return m
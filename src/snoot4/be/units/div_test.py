@@ -0,0 +1,132 @@
+from amaranth import Mux
+import pytest
+
+from amaranth.hdl.dsl import Assert, Assume
+
+from snoot4.be.units import Div
+from snoot4.tests.utils import Spec, assertFormal
+
+
+DivSpec = Spec(Div)
+FusedDivSpec = Spec(Div, steps=4)
+
+
+def _div1Gold(Rn, Rm, T, Q, M):
+    # based on software manual: a literal translation of its DIV1 description
+    old_q = Q
+    Q = Rn[31]
+    tmp0 = ((Rn << 1) | T) & 0xFFFFFFFF
+    sub = (tmp0 - Rm) & 0xFFFFFFFF
+    add = (tmp0 + Rm) & 0xFFFFFFFF
+    sub_tmp1 = sub > tmp0
+    add_tmp1 = add < tmp0
+
+    Rn = Mux(old_q == M, sub, add)
+    Q = Mux(
+        old_q == 0,
+        Mux(
+            M == 0,
+            Mux(Q == 0, sub_tmp1, ~sub_tmp1),
+            Mux(Q == 0, ~add_tmp1, add_tmp1),
+        ),
+        Mux(
+            M == 0,
+            Mux(Q == 0, add_tmp1, ~add_tmp1),
+            Mux(Q == 0, ~sub_tmp1, sub_tmp1),
+        ),
+    )
+    T = Q == M
+    return Rn, T, Q
+
+
+class Div0sSpec(DivSpec):
+    def spec(self, m, gate):
+        Rn, Rm = gate.op1, gate.op2
+
+        m.d.comb += [
+            Assume(gate.sel == Div.Sel.DIV0S),
+            Assert(gate.result == Rn),
+            Assert(gate.result_q == Rn[31]),
+            Assert(gate.result_m == Rm[31]),
+            Assert(gate.result_t == (Rn[31] != Rm[31])),
+        ]
+
+
+class Div0uSpec(DivSpec):
+    def spec(self, m, gate):
+        Rn = gate.op1
+
+        m.d.comb += [
+            Assume(gate.sel == Div.Sel.DIV0U),
+            Assert(gate.result == Rn),
+            Assert(gate.result_q == 0),
+            Assert(gate.result_m == 0),
+            Assert(gate.result_t == 0),
+        ]
+
+
+class Div1Spec(DivSpec):
+    def spec(self, m, gate):
+        gold_result, gold_result_t, gold_result_q = _div1Gold(
+            gate.op1, gate.op2, gate.t, gate.q, gate.m
+        )
+
+        m.d.comb += [
+            Assume(gate.sel == Div.Sel.DIV1),
+            Assert(gate.result == gold_result),
+            Assert(gate.result_t == gold_result_t),
+            Assert(gate.result_q == gold_result_q),
+            Assert(gate.result_m == gate.m),
+        ]
+
+
+class _FusedDiv1Spec:
+    def spec(self, m, gate):
+        # `count` steps are one more DIV1 than `count - 1` steps, which is much easier for
+        # the solver than unrolling all of them into the gold model
+        if self.count == 1:
+            Rn, T, Q = gate.op1, gate.t, gate.q
+        else:
+            m.submodules.previous = previous = Div(steps=gate.steps)
+            m.d.comb += [
+                previous.sel.eq(Div.Sel.DIV1),
+                previous.count.eq(self.count - 1),
+                previous.op1.eq(gate.op1),
+                previous.op2.eq(gate.op2),
+                previous.t.eq(gate.t),
+                previous.q.eq(gate.q),
+                previous.m.eq(gate.m),
+            ]
+            Rn, T, Q = previous.result, previous.result_t, previous.result_q
+
+        gold_result, gold_result_t, gold_result_q = _div1Gold(Rn, gate.op2, T, Q, gate.m)
+
+        m.d.comb += [
+            Assume(gate.sel == Div.Sel.DIV1),
+            Assume(gate.count == self.count),
+            Assert(gate.result == gold_result),
+            Assert(gate.result_t == gold_result_t),
+            Assert(gate.result_q == gold_result_q),
+            Assert(gate.result_m == gate.m),
+        ]
+
+
+class FusedDiv1x1Spec(_FusedDiv1Spec, FusedDivSpec):
+    count = 1
+
+
+class FusedDiv1x2Spec(_FusedDiv1Spec, FusedDivSpec):
+    count = 2
+
+
+class FusedDiv1x3Spec(_FusedDiv1Spec, FusedDivSpec):
+    count = 3
+
+
+class FusedDiv1x4Spec(_FusedDiv1Spec, FusedDivSpec):
+    count = 4
+
+
+@pytest.mark.parametrize("spec", DivSpec.specs + FusedDivSpec.specs)
+def test_div(spec, tmp_path):
+    assertFormal(spec(), tmp_path)
@@ -0,0 +1,140 @@
+from amaranth import Cat, Module, Mux, Signal, signed
+from amaranth.lib import enum
+from amaranth.lib.wiring import Component, In, Out, Signature
+
+MacWritePort = Signature({"en": Out(1), "data": Out(32)})
+
+
+class Mul(Component):
+    """
+    Multiplier, writing its results to MACH and MACL, which it holds.
+
+    A new multiplication can be started every cycle with `valid`, and updates MACH and MACL
+    `latency` cycles later. Products are accumulated in the last stage, so back-to-back
+    MAC.W and MAC.L don't stall either. `busy` is set while any multiplication is in flight,
+    which is when reading MACH or MACL has to wait.
+
+    `mach_w` and `macl_w` write MACH and MACL directly (for LDS and CLRMAC), taking priority
+    over a multiplication finishing in the same cycle.
+    """
+
+    class Sel(enum.Enum):
+        MULL = 0b000
+        MULSW = 0b010
+        MULUW = 0b011
+        DMULSL = 0b100
+        DMULUL = 0b101
+        MACW = 0b110
+        MACL = 0b111
+
+    valid: In(1)
+    sel: In(Sel)
+    op1: In(32)
+    op2: In(32)
+    s: In(1)
+
+    mach_w: In(MacWritePort)
+    macl_w: In(MacWritePort)
+
+    busy: Out(1)
+    mach: Out(32)
+    macl: Out(32)
+
+    def __init__(self, *, latency=2):
+        if latency < 1:
+            raise ValueError(f"latency must be at least 1, not {latency}")
+        self.latency = latency
+        super().__init__()
+
+    def elaborate(self, platform):
+        m = Module()
+
+        # === operands ===
+        # everything is a 33 bit signed multiply, so that signed and unsigned operands
+        # share a single multiplier (which maps onto DSP blocks)
+        word = self.sel.matches(Mul.Sel.MULSW, Mul.Sel.MULUW, Mul.Sel.MACW)
+        unsigned = self.sel.matches(Mul.Sel.MULUW, Mul.Sel.DMULUL)
+
+        def _extend(op):
+            value = Signal(signed(33))
+            with m.If(word):
+                m.d.comb += value.eq(Mux(unsigned, op[0:16], op[0:16].as_signed()))
+            with m.Else():
+                m.d.comb += value.eq(Mux(unsigned, op, op.as_signed()))
+            return value
+
+        a, b = _extend(self.op1), _extend(self.op2)
+
+        # === pipeline ===
+        # the operands go through `latency - 1` stages of registers before the multiplier,
+        # which the synthesis tool can retime into the DSP blocks' own pipeline registers
+        valid, sel, s = self.valid, self.sel, self.s
+        in_flight = []
+        for stage in range(self.latency - 1):
+            stage_valid = Signal(name=f"valid{stage}")
+            stage_sel = Signal(Mul.Sel, name=f"sel{stage}")
+            stage_s = Signal(name=f"s{stage}")
+            stage_a = Signal(signed(33), name=f"a{stage}")
+            stage_b = Signal(signed(33), name=f"b{stage}")
+            m.d.sync += [
+                stage_valid.eq(valid),
+                stage_sel.eq(sel),
+                stage_s.eq(s),
+                stage_a.eq(a),
+                stage_b.eq(b),
+            ]
+
+            valid, sel, s, a, b = stage_valid, stage_sel, stage_s, stage_a, stage_b
+            in_flight.append(stage_valid)
+
+        product = Signal(signed(64))
+        m.d.comb += product.eq(a * b)
+
+        # === accumulate ===
+        mach = Signal(32)
+        macl = Signal(32)
+        mac = Cat(macl, mach)
+
+        # MAC.W with S set only accumulates into MACL, saturating to 32 bits. MAC.L with S
+        # set saturates to 48 bits
+        sum_w = Signal(signed(33))
+        sum_l = Signal(signed(65))
+        m.d.comb += [
+            sum_w.eq(macl.as_signed() + product[0:32].as_signed()),
+            sum_l.eq(mac.as_signed() + product),
+        ]
+
+        def _saturate(value, width):
+            low, high = -(1 << (width - 1)), (1 << (width - 1)) - 1
+            return Mux(value < low, low, Mux(value > high, high, value))
+
+        with m.If(valid):
+            with m.Switch(sel):
+                with m.Case(Mul.Sel.MULL, Mul.Sel.MULSW, Mul.Sel.MULUW):
+                    m.d.sync += macl.eq(product[0:32])
+                with m.Case(Mul.Sel.DMULSL, Mul.Sel.DMULUL):
+                    m.d.sync += mac.eq(product)
+                with m.Case(Mul.Sel.MACW):
+                    with m.If(s):
+                        m.d.sync += macl.eq(_saturate(sum_w, 32))
+                    with m.Else():
+                        m.d.sync += mac.eq(mac + product[0:32].as_signed())
+                with m.Case(Mul.Sel.MACL):
+                    with m.If(s):
+                        m.d.sync += mac.eq(_saturate(sum_l, 48))
+                    with m.Else():
+                        m.d.sync += mac.eq(sum_l)
+
+        with m.If(self.mach_w.en):
+            m.d.sync += mach.eq(self.mach_w.data)
+        with m.If(self.macl_w.en):
+            m.d.sync += macl.eq(self.macl_w.data)
+
+        # === result ===
+        m.d.comb += [
+            self.busy.eq(Cat(self.valid, *in_flight).any()),
+            self.mach.eq(mach),
+            self.macl.eq(macl),
+        ]
+
+        return m
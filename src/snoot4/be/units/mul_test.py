@@ -0,0 +1,111 @@
+import random
+
+from amaranth.sim import Settle, Simulator
+import pytest
+
+from snoot4.be.units import Mul
+
+
+def _signed(value, width):
+    value &= (1 << width) - 1
+    return value - (1 << width) if value >> (width - 1) else value
+
+
+def _saturate(value, width):
+    return max(-(1 << (width - 1)), min(value, (1 << (width - 1)) - 1))
+
+
+def mulReference(sel, op1, op2, s, mach, macl):
+    """
+    `(mach, macl)` after performing `sel` on `op1` (Rn) and `op2` (Rm), based on the
+    software manual.
+    """
+    mac = _signed(mach << 32 | macl, 64)
+    if sel == Mul.Sel.MULL:
+        macl = op1 * op2
+    elif sel == Mul.Sel.MULSW:
+        macl = _signed(op1, 16) * _signed(op2, 16)
+    elif sel == Mul.Sel.MULUW:
+        macl = (op1 & 0xFFFF) * (op2 & 0xFFFF)
+    elif sel == Mul.Sel.DMULSL:
+        mac = _signed(op1, 32) * _signed(op2, 32)
+        mach, macl = mac >> 32, mac
+    elif sel == Mul.Sel.DMULUL:
+        mac = op1 * op2
+        mach, macl = mac >> 32, mac
+    elif sel == Mul.Sel.MACW:
+        product = _signed(op1, 16) * _signed(op2, 16)
+        if s:
+            macl = _saturate(_signed(macl, 32) + product, 32)
+        else:
+            mac += product
+            mach, macl = mac >> 32, mac
+    elif sel == Mul.Sel.MACL:
+        mac += _signed(op1, 32) * _signed(op2, 32)
+        if s:
+            mac = _saturate(mac, 48)
+        mach, macl = mac >> 32, mac
+
+    return mach & 0xFFFFFFFF, macl & 0xFFFFFFFF
+
+
+def _operand(rng):
+    # mostly extreme values, which are the ones that overflow and saturate
+    return rng.choice([0, 1, 0x7FFF, 0x8000, 0xFFFF, 0x7FFFFFFF, 0x80000000, 0xFFFFFFFF, None])
+
+
+@pytest.mark.parametrize("latency", [1, 2, 3])
+def test_mul(latency):
+    rng = random.Random(latency)
+    dut = Mul(latency=latency)
+
+    def bench():
+        mach, macl = 0, 0
+        in_flight = [None] * latency
+        for cycle in range(2000):
+            # === stimulus ===
+            op = None
+            if rng.random() < 0.8:
+                op = (
+                    rng.choice(list(Mul.Sel)),
+                    _operand(rng) or rng.getrandbits(32),
+                    _operand(rng) or rng.getrandbits(32),
+                    rng.getrandbits(1),
+                )
+            write_h = rng.getrandbits(32) if rng.random() < 0.05 else None
+            write_l = rng.getrandbits(32) if rng.random() < 0.05 else None
+
+            yield dut.valid.eq(op is not None)
+            if op is not None:
+                sel, op1, op2, s = op
+                yield dut.sel.eq(sel)
+                yield dut.op1.eq(op1)
+                yield dut.op2.eq(op2)
+                yield dut.s.eq(s)
+            yield dut.mach_w.en.eq(write_h is not None)
+            yield dut.mach_w.data.eq(write_h or 0)
+            yield dut.macl_w.en.eq(write_l is not None)
+            yield dut.macl_w.data.eq(write_l or 0)
+            yield Settle()
+
+            # === check ===
+            in_flight = [op] + in_flight[:-1]
+            assert (yield dut.busy) == any(in_flight)
+            assert (yield dut.mach) == mach, f"MACH in cycle {cycle}"
+            assert (yield dut.macl) == macl, f"MACL in cycle {cycle}"
+
+            # === reference ===
+            if in_flight[-1] is not None:
+                mach, macl = mulReference(*in_flight[-1], mach, macl)
+            if write_h is not None:
+                mach = write_h
+            if write_l is not None:
+                macl = write_l
+
+            yield
+
+    sim = Simulator(dut)
+    sim.add_clock(1e-6)
+    sim.add_sync_process(bench)
+    sim.run()
+
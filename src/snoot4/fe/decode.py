@@ -0,0 +1,213 @@
+from amaranth import Module, Shape
+from amaranth.lib import enum
+from amaranth.lib.wiring import Component, In, Out
+
+from snoot4.be.units import Alu, Cmp, Div, Mul
+from snoot4.be.units.mem import Width
+
+
+class Group(enum.Enum):
+    # the SH-4's instruction groups, which decide which instructions can issue together
+    MT = 0
+    EX = 1
+    BR = 2
+    LS = 3
+    FE = 4
+    CO = 5
+
+
+class Unit(enum.Enum):
+    ALU = 0
+    CMP = 1
+    MUL = 2
+    DIV = 3
+    LOAD = 4
+    STORE = 5
+
+
+# every instruction the decoder knows, with the unit that executes it and that unit's
+# selector. `n` and `m` are the Rn and Rm fields of the encoding, which go to the unit as
+# op1 and op2 (loads read from @Rm, and stores write Rm to @Rn). `reads` and `writes` are
+# the registers it uses, for hazard detection, and `group` its SH-4 instruction group
+OPCODES = [
+    # (mnemonic, encoding, unit, selector, reads, writes, group)
+    ("ADD", "0011nnnnmmmm1100", Unit.ALU, Alu.Sel.ADDC, "Rn Rm", "Rn", Group.EX),
+    ("ADDC", "0011nnnnmmmm1110", Unit.ALU, Alu.Sel.ADDC, "Rn Rm T", "Rn T", Group.EX),
+    ("ADDV", "0011nnnnmmmm1111", Unit.ALU, Alu.Sel.ADDV, "Rn Rm", "Rn T", Group.EX),
+    ("SUB", "0011nnnnmmmm1000", Unit.ALU, Alu.Sel.SUBC, "Rn Rm", "Rn", Group.EX),
+    ("SUBC", "0011nnnnmmmm1010", Unit.ALU, Alu.Sel.SUBC, "Rn Rm T", "Rn T", Group.EX),
+    ("SUBV", "0011nnnnmmmm1011", Unit.ALU, Alu.Sel.SUBV, "Rn Rm", "Rn T", Group.EX),
+    ("NOT", "0110nnnnmmmm0111", Unit.ALU, Alu.Sel.NOT, "Rm", "Rn", Group.EX),
+    ("AND", "0010nnnnmmmm1001", Unit.ALU, Alu.Sel.AND, "Rn Rm", "Rn", Group.EX),
+    ("XOR", "0010nnnnmmmm1010", Unit.ALU, Alu.Sel.XOR, "Rn Rm", "Rn", Group.EX),
+    ("OR", "0010nnnnmmmm1011", Unit.ALU, Alu.Sel.OR, "Rn Rm", "Rn", Group.EX),
+    ("EXTU.B", "0110nnnnmmmm1100", Unit.ALU, Alu.Sel.EXTUB, "Rm", "Rn", Group.EX),
+    ("EXTU.W", "0110nnnnmmmm1101", Unit.ALU, Alu.Sel.EXTUW, "Rm", "Rn", Group.EX),
+    ("EXTS.B", "0110nnnnmmmm1110", Unit.ALU, Alu.Sel.EXTSB, "Rm", "Rn", Group.EX),
+    ("EXTS.W", "0110nnnnmmmm1111", Unit.ALU, Alu.Sel.EXTSW, "Rm", "Rn", Group.EX),
+    ("SWAP.B", "0110nnnnmmmm1000", Unit.ALU, Alu.Sel.SWAPB, "Rm", "Rn", Group.EX),
+    ("SWAP.W", "0110nnnnmmmm1001", Unit.ALU, Alu.Sel.SWAPW, "Rm", "Rn", Group.EX),
+    ("XTRCT", "0010nnnnmmmm1101", Unit.ALU, Alu.Sel.XTRCT, "Rn Rm", "Rn", Group.EX),
+    ("SHLL", "0100nnnn00000000", Unit.ALU, Alu.Sel.SHLL, "Rn", "Rn T", Group.EX),
+    ("SHLR", "0100nnnn00000001", Unit.ALU, Alu.Sel.SHLR, "Rn", "Rn T", Group.EX),
+    ("SHAL", "0100nnnn00100000", Unit.ALU, Alu.Sel.SHAL, "Rn", "Rn T", Group.EX),
+    ("SHAR", "0100nnnn00100001", Unit.ALU, Alu.Sel.SHAR, "Rn", "Rn T", Group.EX),
+    ("ROTL", "0100nnnn00000100", Unit.ALU, Alu.Sel.ROTL, "Rn", "Rn T", Group.EX),
+    ("ROTR", "0100nnnn00000101", Unit.ALU, Alu.Sel.ROTR, "Rn", "Rn T", Group.EX),
+    ("ROTCL", "0100nnnn00100100", Unit.ALU, Alu.Sel.ROTCL, "Rn T", "Rn T", Group.EX),
+    ("ROTCR", "0100nnnn00100101", Unit.ALU, Alu.Sel.ROTCR, "Rn T", "Rn T", Group.EX),
+    ("SHLL2", "0100nnnn00001000", Unit.ALU, Alu.Sel.SHLL2, "Rn", "Rn", Group.EX),
+    ("SHLR2", "0100nnnn00001001", Unit.ALU, Alu.Sel.SHLR2, "Rn", "Rn", Group.EX),
+    ("SHLL8", "0100nnnn00011000", Unit.ALU, Alu.Sel.SHLL8, "Rn", "Rn", Group.EX),
+    ("SHLR8", "0100nnnn00011001", Unit.ALU, Alu.Sel.SHLR8, "Rn", "Rn", Group.EX),
+    ("SHLL16", "0100nnnn00101000", Unit.ALU, Alu.Sel.SHLL16, "Rn", "Rn", Group.EX),
+    ("SHLR16", "0100nnnn00101001", Unit.ALU, Alu.Sel.SHLR16, "Rn", "Rn", Group.EX),
+    ("SHAD", "0100nnnnmmmm1100", Unit.ALU, Alu.Sel.SHAD, "Rn Rm", "Rn", Group.EX),
+    ("SHLD", "0100nnnnmmmm1101", Unit.ALU, Alu.Sel.SHLD, "Rn Rm", "Rn", Group.EX),
+    ("CMP/EQ", "0011nnnnmmmm0000", Unit.CMP, Cmp.Sel.EQ, "Rn Rm", "T", Group.MT),
+    ("CMP/HS", "0011nnnnmmmm0010", Unit.CMP, Cmp.Sel.HS, "Rn Rm", "T", Group.MT),
+    ("CMP/GE", "0011nnnnmmmm0011", Unit.CMP, Cmp.Sel.GE, "Rn Rm", "T", Group.MT),
+    ("CMP/HI", "0011nnnnmmmm0110", Unit.CMP, Cmp.Sel.HI, "Rn Rm", "T", Group.MT),
+    ("CMP/GT", "0011nnnnmmmm0111", Unit.CMP, Cmp.Sel.GT, "Rn Rm", "T", Group.MT),
+    ("CMP/STR", "0010nnnnmmmm1100", Unit.CMP, Cmp.Sel.STR, "Rn Rm", "T", Group.MT),
+    ("TST", "0010nnnnmmmm1000", Unit.CMP, Cmp.Sel.TST, "Rn Rm", "T", Group.MT),
+    ("CLRT", "0000000000001000", Unit.CMP, Cmp.Sel.CLR, "", "T", Group.MT),
+    ("SETT", "0000000000011000", Unit.CMP, Cmp.Sel.SET, "", "T", Group.MT),
+    ("MUL.L", "0000nnnnmmmm0111", Unit.MUL, Mul.Sel.MULL, "Rn Rm", "", Group.CO),
+    ("MULS.W", "0010nnnnmmmm1111", Unit.MUL, Mul.Sel.MULSW, "Rn Rm", "", Group.CO),
+    ("MULU.W", "0010nnnnmmmm1110", Unit.MUL, Mul.Sel.MULUW, "Rn Rm", "", Group.CO),
+    ("DMULS.L", "0011nnnnmmmm1101", Unit.MUL, Mul.Sel.DMULSL, "Rn Rm", "", Group.CO),
+    ("DMULU.L", "0011nnnnmmmm0101", Unit.MUL, Mul.Sel.DMULUL, "Rn Rm", "", Group.CO),
+    ("DIV0S", "0010nnnnmmmm0111", Unit.DIV, Div.Sel.DIV0S, "Rn Rm", "T", Group.EX),
+    ("DIV0U", "0000000000011001", Unit.DIV, Div.Sel.DIV0U, "", "T", Group.EX),
+    ("DIV1", "0011nnnnmmmm0100", Unit.DIV, Div.Sel.DIV1, "Rn Rm T", "Rn T", Group.EX),
+    ("MOV.B @Rm,Rn", "0110nnnnmmmm0000", Unit.LOAD, Width.B, "Rm", "Rn", Group.LS),
+    ("MOV.W @Rm,Rn", "0110nnnnmmmm0001", Unit.LOAD, Width.W, "Rm", "Rn", Group.LS),
+    ("MOV.L @Rm,Rn", "0110nnnnmmmm0010", Unit.LOAD, Width.L, "Rm", "Rn", Group.LS),
+    ("MOV.B Rm,@Rn", "0010nnnnmmmm0000", Unit.STORE, Width.B, "Rn Rm", "", Group.LS),
+    ("MOV.W Rm,@Rn", "0010nnnnmmmm0001", Unit.STORE, Width.W, "Rn Rm", "", Group.LS),
+    ("MOV.L Rm,@Rn", "0010nnnnmmmm0010", Unit.STORE, Width.L, "Rn Rm", "", Group.LS),
+]
+
+# wide enough for the selector of any unit
+SEL_WIDTH = max(Shape.cast(type(sel)).width for _, _, _, sel, *_ in OPCODES)
+
+
+def pattern(encoding):
+    """
+    The encoding of an opcode as a pattern for `Value.matches`, its fields don't care.
+    """
+    return "".join(c if c in "01" else "-" for c in encoding)
+
+
+def _intersects(a, b):
+    return all(x == y or "-" in (x, y) for x, y in zip(a, b))
+
+
+def _covers(a, b):
+    return all(x == "-" or x == y for x, y in zip(a, b))
+
+
+def minimise(on, off):
+    """
+    Patterns matching every encoding matched by the patterns of `on` and none matched by
+    those of `off`, anything else being don't care. Each pattern of `on` is widened one bit
+    at a time for as long as it stays clear of `off`, then those that are covered by
+    another are dropped.
+    """
+    expanded = []
+    for cube in on:
+        cube = list(cube)
+        for i, c in enumerate(cube):
+            if c == "-":
+                continue
+            cube[i] = "-"
+            if any(_intersects(cube, other) for other in off):
+                cube[i] = c
+        if "".join(cube) not in expanded:
+            expanded.append("".join(cube))
+
+    return [
+        cube
+        for cube in expanded
+        if not any(other != cube and _covers(other, cube) for other in expanded)
+    ]
+
+
+class Decoder(Component):
+    """
+    Single cycle decoder of the instructions in `OPCODES`.
+
+    `sel` is the selector of `unit`: the decoder has one selector output wide enough for
+    any of them, rather than one per unit. An instruction that doesn't read T should be
+    given T = 0 (which makes ADDC and SUBC into ADD and SUB).
+    """
+
+    insn: In(16)
+
+    valid: Out(1)
+    unit: Out(Unit)
+    sel: Out(SEL_WIDTH)
+    group: Out(Group)
+
+    rn: Out(4)
+    rm: Out(4)
+
+    read_rn: Out(1)
+    read_rm: Out(1)
+    read_t: Out(1)
+    write_rn: Out(1)
+    write_t: Out(1)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        m.d.comb += [
+            self.rn.eq(self.insn[8:12]),
+            self.rm.eq(self.insn[4:8]),
+        ]
+
+        # each output bit is the OR of the opcodes that set it. only `valid` has to be 0 for
+        # encodings that aren't in the table, so the others only need to be right for the
+        # opcodes that are, which lets them be decoded from far fewer bits
+        outputs = [
+            self.unit,
+            self.sel,
+            self.group,
+            self.read_rn,
+            self.read_rm,
+            self.read_t,
+            self.write_rn,
+            self.write_t,
+        ]
+        on = [[[] for _ in range(len(output))] for output in outputs]
+        off = [[[] for _ in range(len(output))] for output in outputs]
+        for _, encoding, unit, sel, reads, writes, group in OPCODES:
+            reads, writes = reads.split(), writes.split()
+            values = [
+                unit.value,
+                sel.value,
+                group.value,
+                "Rn" in reads,
+                "Rm" in reads,
+                "T" in reads,
+                "Rn" in writes,
+                "T" in writes,
+            ]
+            for output_on, output_off, value in zip(on, off, values):
+                for bit in range(len(output_on)):
+                    if (value >> bit) & 1:
+                        output_on[bit].append(pattern(encoding))
+                    else:
+                        output_off[bit].append(pattern(encoding))
+
+        m.d.comb += self.valid.eq(
+            self.insn.matches(*(pattern(encoding) for _, encoding, *_ in OPCODES))
+        )
+        for output, output_on, output_off in zip(outputs, on, off):
+            for bit in range(len(output)):
+                if output_on[bit]:
+                    patterns = minimise(output_on[bit], output_off[bit])
+                    m.d.comb += output[bit].eq(self.insn.matches(*patterns))
+
+        return m
@@ -0,0 +1,51 @@
+import itertools
+
+import pytest
+
+from amaranth.hdl.dsl import Assert
+
+from snoot4.fe.decode import OPCODES, Decoder, pattern
+from snoot4.tests.utils import Spec, assertFormal
+
+
+DecoderSpec = Spec(Decoder)
+
+
+class OpcodeSpec(DecoderSpec):
+    def spec(self, m, gate):
+        for _, encoding, unit, sel, reads, writes, group in OPCODES:
+            reads, writes = reads.split(), writes.split()
+            with m.If(gate.insn.matches(pattern(encoding))):
+                m.d.comb += [
+                    Assert(gate.valid),
+                    Assert(gate.unit == unit),
+                    Assert(gate.sel == sel.value),
+                    Assert(gate.group == group),
+                    Assert(gate.rn == gate.insn[8:12]),
+                    Assert(gate.rm == gate.insn[4:8]),
+                    Assert(gate.read_rn == ("Rn" in reads)),
+                    Assert(gate.read_rm == ("Rm" in reads)),
+                    Assert(gate.read_t == ("T" in reads)),
+                    Assert(gate.write_rn == ("Rn" in writes)),
+                    Assert(gate.write_t == ("T" in writes)),
+                ]
+
+
+class InvalidSpec(DecoderSpec):
+    def spec(self, m, gate):
+        patterns = [pattern(encoding) for _, encoding, *_ in OPCODES]
+        with m.If(~gate.insn.matches(*patterns)):
+            m.d.comb += Assert(~gate.valid)
+
+
+@pytest.mark.parametrize("spec", DecoderSpec.specs)
+def test_decoder(spec, tmp_path):
+    assertFormal(spec(), tmp_path)
+
+
+def test_opcodes_disjoint():
+    for (a, encoding_a, *_), (b, encoding_b, *_) in itertools.combinations(OPCODES, 2):
+        overlap = all(
+            x == y or "-" in (x, y) for x, y in zip(pattern(encoding_a), pattern(encoding_b))
+        )
+        assert not overlap, f"{a} and {b} have overlapping encodings"
@@ -0,0 +1,217 @@
+from amaranth import Array, Cat, Module, Mux, Signal
+from amaranth.lib import data
+from amaranth.lib.wiring import Component, In, Out, Signature
+
+# a request is accepted when `re` and `ready` are both set, and `rdata` is the (big endian)
+# word at its `addr` the cycle after
+InstructionBus = Signature(
+    {
+        "addr": Out(32),
+        "re": Out(1),
+        "ready": In(1),
+        "rdata": In(32),
+    }
+)
+
+# restart fetch at `pc`, after a mispredicted branch
+Redirect = Signature({"valid": Out(1), "pc": Out(32)})
+
+# the outcome of the conditional branch at `pc`, for training the predictor
+BranchUpdate = Signature({"valid": Out(1), "pc": Out(32), "taken": Out(1)})
+
+_Entry = data.StructLayout({"insn": 16, "pc": 32, "prediction": 1})
+
+
+class Fetch(Component):
+    """
+    Fetches a 32 bit word (two instructions) at a time into a queue of `depth` instructions,
+    and offers the oldest `issue` of them in the same way as `Backend` expects: the first
+    `n` slots of `insn` are valid where `n` is the number of low bits set in `valid`, and
+    `taken` says how many of them were consumed. Each instruction comes with its `pc`, and
+    `prediction` is set for branches predicted taken.
+
+    BT, BF, BT/S, BF/S, BRA and BSR are predicted as they arrive, so a taken branch costs no
+    cycles at all if the queue is deep enough to cover the fetch latency. BRA and BSR are
+    always taken, and conditional branches use either a `"static"` predictor (backwards
+    taken, forwards not) or a `"bimodal"` one of `entries` 2-bit counters trained by
+    `update`. The delay slot of a delayed branch is always queued after it, before the
+    instructions of whichever path was predicted.
+
+    `mispredicts` counts `redirect`s, and `empty` the cycles there was nothing to offer.
+    """
+
+    def __init__(self, *, depth=8, issue=1, predictor="static", entries=64, reset_pc=0xA0000000):
+        if depth < max(2, issue):
+            raise ValueError(f"depth must be at least 2 and at least issue, not {depth}")
+        if entries & (entries - 1):
+            raise ValueError(f"entries must be a power of two, not {entries}")
+        if predictor not in ("static", "bimodal"):
+            raise ValueError(f"predictor must be 'static' or 'bimodal', not {predictor!r}")
+        self.depth = depth
+        self.issue = issue
+        self.predictor = predictor
+        self.entries = entries
+        self.reset_pc = reset_pc
+        super().__init__(
+            {
+                "ibus": Out(InstructionBus),
+                "valid": Out(issue),
+                "insn": Out(16 * issue),
+                "pc": Out(32 * issue),
+                "prediction": Out(issue),
+                "taken": In(range(issue + 1)),
+                "redirect": In(Redirect),
+                "update": In(BranchUpdate),
+                "mispredicts": Out(32),
+                "empty": Out(32),
+            }
+        )
+
+    def elaborate(self, platform):
+        m = Module()
+
+        # === predictor ===
+        counters = Array(Signal(2, reset=0b01, name=f"bht{i}") for i in range(self.entries))
+
+        def _index(pc):
+            return pc[1 : 1 + (self.entries - 1).bit_length()]
+
+        for i, counter in enumerate(counters):
+            with m.If(self.update.valid & (_index(self.update.pc) == i)):
+                with m.If(self.update.taken & (counter != 0b11)):
+                    m.d.sync += counter.eq(counter + 1)
+                with m.Elif(~self.update.taken & (counter != 0b00)):
+                    m.d.sync += counter.eq(counter - 1)
+
+        def _predecode(insn, pc):
+            # returns (predicted taken, delayed, target) for the instruction at `pc`
+            conditional = (insn[11:16] == 0b10001) & insn[8]
+            always = insn[13:16] == 0b101
+            disp = Mux(always, insn[0:12].as_signed(), insn[0:8].as_signed())
+            target = Signal(32)
+            m.d.comb += target.eq(pc + 4 + (disp << 1))
+            guess = Signal()
+            if self.predictor == "static":
+                m.d.comb += guess.eq(disp < 0)
+            else:
+                m.d.comb += guess.eq(counters[_index(pc)][1])
+            taken = Signal()
+            m.d.comb += taken.eq(always | (conditional & guess))
+            return taken, always | insn[10], target
+
+        # === response ===
+        fetch_pc = Signal(32, reset=self.reset_pc)
+        inflight = Signal()
+        resp_pc = Signal(32)
+        # the delay slot of a branch taken from the second half of the word in flight, after
+        # which fetch continues at `pending_target`
+        pending = Signal()
+        pending_target = Signal(32)
+
+        base = Cat(0, 0, resp_pc[2:])
+        halves = [
+            (self.ibus.rdata[16:32], base),
+            (self.ibus.rdata[0:16], base + 2),
+        ]
+        predicted = [_predecode(insn, pc) for insn, pc in halves]
+
+        new = [Signal(_Entry, name=f"new{i}") for i in range(2)]
+        new_count = Signal(range(3))
+        next_pc = Signal(32)
+        m.d.comb += next_pc.eq(fetch_pc)
+
+        def _enqueue(*slots):
+            for entry, (half, prediction) in zip(new, slots):
+                insn, pc = halves[half]
+                m.d.comb += [
+                    entry.insn.eq(insn),
+                    entry.pc.eq(pc),
+                    entry.prediction.eq(prediction),
+                ]
+            m.d.comb += new_count.eq(len(slots))
+
+        def _second(*first):
+            # the second half of the word goes after `first`. if it's a taken delayed branch
+            # its delay slot is in the next word, so that has to be fetched first
+            taken, delayed, target = predicted[1]
+            _enqueue(*first, (1, taken))
+            with m.If(taken & delayed):
+                m.d.sync += [pending.eq(1), pending_target.eq(target)]
+            with m.Elif(taken):
+                m.d.comb += next_pc.eq(target)
+
+        with m.If(inflight & ~self.redirect.valid):
+            taken, delayed, target = predicted[0]
+            with m.If(pending):
+                _enqueue((0, 0))
+                m.d.comb += next_pc.eq(pending_target)
+                m.d.sync += pending.eq(0)
+            with m.Elif(resp_pc[1]):
+                _second()
+            with m.Elif(taken & delayed):
+                # the second half is the delay slot
+                _enqueue((0, 1), (1, 0))
+                m.d.comb += next_pc.eq(target)
+            with m.Elif(taken):
+                _enqueue((0, 1))
+                m.d.comb += next_pc.eq(target)
+            with m.Else():
+                _second((0, 0))
+
+        with m.If(self.redirect.valid):
+            m.d.comb += next_pc.eq(self.redirect.pc)
+            m.d.sync += pending.eq(0)
+
+        # === queue ===
+        queue = [Signal(_Entry, name=f"queue{i}") for i in range(self.depth)]
+        count = Signal(range(self.depth + 1))
+
+        left = Signal(range(self.depth + 1))
+        m.d.comb += left.eq(count - self.taken)
+        shifted = Array(queue + new)
+        for i, entry in enumerate(queue):
+            m.d.sync += entry.eq(shifted[Mux(i < left, i + self.taken, self.depth + i - left)])
+        with m.If(self.redirect.valid):
+            m.d.sync += count.eq(0)
+        with m.Else():
+            m.d.sync += count.eq(left + new_count)
+
+        for i in range(self.issue):
+            m.d.comb += [
+                self.valid[i].eq(count > i),
+                self.insn[16 * i : 16 * (i + 1)].eq(queue[i].insn),
+                self.pc[32 * i : 32 * (i + 1)].eq(queue[i].pc),
+                self.prediction[i].eq(queue[i].prediction),
+            ]
+
+        # === request ===
+        # only ask for a word if there'll be room for it when it arrives
+        room = Signal()
+        with m.If(self.redirect.valid):
+            m.d.comb += room.eq(1)
+        with m.Else():
+            m.d.comb += room.eq(left + new_count + 2 <= self.depth)
+
+        m.d.comb += [
+            self.ibus.addr.eq(Cat(0, 0, next_pc[2:])),
+            self.ibus.re.eq(room),
+        ]
+        with m.If(self.ibus.re & self.ibus.ready):
+            m.d.sync += [
+                fetch_pc.eq(Cat(0, 0, next_pc[2:]) + 4),
+                inflight.eq(1),
+                resp_pc.eq(next_pc),
+            ]
+        with m.Else():
+            m.d.sync += [
+                fetch_pc.eq(next_pc),
+                inflight.eq(0),
+            ]
+
+        # === counters ===
+        m.d.sync += [
+            self.mispredicts.eq(self.mispredicts + self.redirect.valid),
+            self.empty.eq(self.empty + (count == 0)),
+        ]
+
+        return m
@@ -0,0 +1,194 @@
+from amaranth.sim import Settle, Simulator
+import pytest
+
+from snoot4.fe.fetch import Fetch
+
+NOP = 0x0009
+
+
+def _branch(opcode, pc, target, bits=8):
+    disp = (target - pc - 4) // 2
+    return (opcode << bits) | (disp & ((1 << bits) - 1))
+
+
+def bt(pc, target):
+    return _branch(0x89, pc, target)
+
+
+def bfs(pc, target):
+    return _branch(0x8F, pc, target)
+
+
+def bra(pc, target):
+    return _branch(0xA, pc, target, bits=12)
+
+
+def bsr(pc, target):
+    return _branch(0xB, pc, target, bits=12)
+
+
+def _decode(insn, pc):
+    # returns (conditional on T, taken if T, delayed, target), or None for non-branches
+    if insn >> 12 in (0xA, 0xB):
+        disp = (insn & 0xFFF) - ((insn & 0x800) << 1)
+        return False, True, True, pc + 4 + disp * 2
+    if insn >> 8 in (0x89, 0x8B, 0x8D, 0x8F):
+        disp = (insn & 0xFF) - ((insn & 0x80) << 1)
+        return True, not insn & 0x200, bool(insn & 0x400), pc + 4 + disp * 2
+    return None
+
+
+def _outcome(program, t, pc, visits):
+    # returns (taken, the pc after the branch and its delay slot)
+    conditional, if_t, delayed, target = _decode(program[pc], pc)
+    taken = not conditional or t(pc, visits) == if_t
+    return taken, target if taken else pc + (4 if delayed else 2)
+
+
+def trace(program, t, length):
+    """The pcs the program at `program` (a dict of instructions by pc) runs through."""
+    pcs = []
+    pc = 0
+    visits = {}
+    after_slot = None
+    while len(pcs) < length:
+        pcs.append(pc)
+        insn = program.get(pc, NOP)
+        if after_slot is not None:
+            pc, after_slot = after_slot, None
+        elif _decode(insn, pc):
+            visits[pc] = visits.get(pc, -1) + 1
+            taken, next_pc = _outcome(program, t, pc, visits[pc])
+            if _decode(insn, pc)[2]:
+                after_slot = next_pc
+                pc += 2
+            else:
+                pc = next_pc
+        else:
+            pc += 2
+    return pcs
+
+
+def run(program, t, length, *, ready=lambda cycle: True, **kwargs):
+    """
+    Run `Fetch` over the program at `program`, with conditional branches resolved by
+    `t(pc, visits)`, checking it offers the instructions `trace` expects. Returns the
+    counters and the number of cycles it took.
+    """
+    dut = Fetch(reset_pc=0, **kwargs)
+    expected = trace(program, t, length)
+    result = {}
+
+    def bench():
+        consumed = 0
+        visits = {}
+        redirect = None
+        after_slot = None
+        read = None
+        cycle = 0
+        while consumed < len(expected):
+            cycle += 1
+            assert cycle < length * 8, "fetch stopped making progress"
+
+            yield dut.ibus.ready.eq(ready(cycle))
+            yield dut.redirect.valid.eq(redirect is not None)
+            yield dut.redirect.pc.eq(redirect or 0)
+            yield dut.update.valid.eq(0)
+            redirect = None
+
+            yield Settle()
+
+            taken = 0
+            if not (yield dut.redirect.valid):
+                valid = yield dut.valid
+                for slot in range(dut.issue):
+                    if not (valid >> slot) & 1 or redirect is not None:
+                        break
+                    pc = ((yield dut.pc) >> (32 * slot)) & 0xFFFFFFFF
+                    insn = ((yield dut.insn) >> (16 * slot)) & 0xFFFF
+                    prediction = ((yield dut.prediction) >> slot) & 1
+                    assert pc == expected[consumed], f"offered {pc:#x} at {consumed}"
+                    assert insn == program.get(pc, NOP)
+                    consumed += 1
+                    taken += 1
+
+                    branch = _decode(insn, pc)
+                    if after_slot is not None:
+                        redirect, after_slot = after_slot, None
+                    elif branch:
+                        visits[pc] = visits.get(pc, -1) + 1
+                        actual, next_pc = _outcome(program, t, pc, visits[pc])
+                        if branch[0]:
+                            yield dut.update.valid.eq(1)
+                            yield dut.update.pc.eq(pc)
+                            yield dut.update.taken.eq(actual)
+                        if actual != prediction and branch[2]:
+                            # the delay slot is on both paths, so redirect after it
+                            after_slot = next_pc
+                        elif actual != prediction:
+                            redirect = next_pc
+            yield dut.taken.eq(taken)
+            yield Settle()
+
+            addr = yield dut.ibus.addr
+            next_read = addr if (yield dut.ibus.re) and (yield dut.ibus.ready) else None
+            yield
+            read = next_read
+            if read is not None:
+                word = program.get(read, NOP) << 16 | program.get(read + 2, NOP)
+                yield dut.ibus.rdata.eq(word)
+
+        result["cycles"] = cycle
+        for counter in ["mispredicts", "empty"]:
+            result[counter] = yield getattr(dut, counter)
+
+    sim = Simulator(dut)
+    sim.add_clock(1e-6)
+    sim.add_sync_process(bench)
+    sim.run()
+    return result
+
+
+# a loop closed by a delayed branch in the second half of a word (so its delay slot is in
+# the next), then a taken forward branch and unconditional branches from both halves
+_PROGRAM = {
+    0x06: bfs(0x06, 0x04),
+    0x0A: bt(0x0A, 0x10),
+    0x10: bra(0x10, 0x20),
+    0x22: bsr(0x22, 0x30),
+}
+
+
+def _loop(pc, visits):
+    # the BF/S loops 9 times, and the BT is always taken
+    return pc == 0x0A or visits >= 9
+
+
+@pytest.mark.parametrize(
+    "predictor,mispredicts",
+    [
+        # only the loop exit and the forward branch
+        ("static", 2),
+        # the loop branch is weakly not taken to begin with, as is the forward branch
+        ("bimodal", 3),
+    ],
+)
+@pytest.mark.parametrize("issue", [1, 2])
+def test_branches(predictor, mispredicts, issue):
+    result = run(_PROGRAM, _loop, 64, predictor=predictor, issue=issue)
+    assert result["mispredicts"] == mispredicts
+
+
+def test_stalling_bus():
+    result = run(_PROGRAM, _loop, 64, ready=lambda cycle: cycle % 3 != 0)
+    assert result["mispredicts"] == 2
+
+
+def test_throughput():
+    # one word a cycle keeps two instructions a cycle flowing, and taken branches are free
+    # once the queue has filled up
+    program = {0x40: bra(0x40, 0x80), 0x82: bra(0x82, 0x10)}
+    result = run(program, None, 128, issue=2)
+    assert result["mispredicts"] == 0
+    assert result["cycles"] <= 128 // 2 + 4
+
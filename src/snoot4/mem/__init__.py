@@ -0,0 +1,21 @@
+from amaranth.lib.wiring import In, Out, Signature
+
+# bursts of `length` words between a cache and external memory. a burst starts at `addr` and
+# wraps around at the `length` word boundary it's in, so the critical word goes first. it's
+# accepted when `req` and `ack` are both set, after which a read returns one word of `rdata`
+# each cycle `rvalid` is set, and a write takes one word of `wdata` and `wstb` each cycle
+# `wready` is set
+BurstBus = Signature(
+    {
+        "addr": Out(32),
+        "req": Out(1),
+        "we": Out(1),
+        "length": Out(8),
+        "ack": In(1),
+        "rdata": In(32),
+        "rvalid": In(1),
+        "wdata": Out(32),
+        "wstb": Out(4),
+        "wready": In(1),
+    }
+)
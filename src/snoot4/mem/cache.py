@@ -0,0 +1,38 @@
+from amaranth.lib.wiring import Component
+
+
+def _log2(value, name):
+    if value < 1 or value & (value - 1):
+        raise ValueError(f"{name} must be a power of two, not {value}")
+    return value.bit_length() - 1
+
+
+class Cache(Component):
+    """
+    Base for caches of `size` bytes in lines of `line` bytes, `ways` way set associative,
+    with the ports in `members`.
+    """
+
+    def __init__(self, members, *, size, line, ways):
+        self.size = size
+        self.line = line
+        self.ways = ways
+
+        self._offset_bits = _log2(line, "line")
+        self._way_bits = _log2(ways, "ways")
+        self._set_bits = _log2(size, "size") - self._offset_bits - self._way_bits
+        if self._offset_bits < 3 or line // 4 > 128:
+            raise ValueError(f"line must be between 8 and 512 bytes, not {line}")
+        if self._set_bits < 1:
+            raise ValueError(f"size must be at least 2 * line * ways, not {size}")
+
+        # way numbers are at least one bit wide, as the simulator mishandles zero width
+        self._way_shape = max(1, self._way_bits)
+
+        super().__init__(members)
+
+    def _split(self, addr):
+        # (word in line, set, tag)
+        set_start = self._offset_bits
+        tag_start = set_start + self._set_bits
+        return addr[2:set_start], addr[set_start:tag_start], addr[tag_start:]
@@ -0,0 +1,217 @@
+from amaranth import Array, C, Cat, Memory, Module, Signal
+from amaranth.lib.wiring import In, Out
+
+from snoot4.be.backend import DataBus
+from snoot4.mem import BurstBus
+from snoot4.mem.cache import Cache
+
+
+class DCache(Cache):
+    """
+    Write-back, write-allocate operand cache serving `Backend` on `cpu`, and refilling from
+    and writing back to `mem`.
+
+    Tags are looked up as the request arrives, so a hit is accepted straight away: a load's
+    word is on `rdata` the cycle after, in time for `MemoryRead` in M, and a store's `wstb`
+    lanes of `wdata` are merged into the line. A miss holds `ready` low while the victim
+    line is written back (if it's dirty) and the missed line refilled, after which the
+    request hits.
+
+    Victims are invalid ways if there are any, and otherwise picked round robin. `hits`,
+    `misses` and `writebacks` count from reset.
+    """
+
+    def __init__(self, *, size=16384, line=32, ways=2):
+        super().__init__(
+            {
+                "cpu": In(DataBus),
+                "mem": Out(BurstBus),
+                "hits": Out(32),
+                "misses": Out(32),
+                "writebacks": Out(32),
+            },
+            size=size,
+            line=line,
+            ways=ways,
+        )
+
+    def elaborate(self, platform):
+        m = Module()
+        words = self.line // 4
+        sets = 1 << self._set_bits
+        word, set_, tag = self._split(self.cpu.addr)
+        request = self.cpu.re | self.cpu.we
+
+        miss_addr = Signal(32)
+        miss_way = Signal(self._way_shape)
+        miss_word, miss_set, miss_tag = self._split(miss_addr)
+        idle = Signal()
+
+        # words move to and from `mem` one at a time, the refill wrapping around from the
+        # missed word
+        moved = Signal(range(words))
+        moving = Signal(len(miss_word))
+        m.d.comb += moving.eq(miss_word + moved)
+
+        # === lookup ===
+        valid = [Signal(sets, name=f"valid{way}") for way in range(self.ways)]
+        dirty = [Signal(sets, name=f"dirty{way}") for way in range(self.ways)]
+        hits = []
+        tags_r = []
+        tags_w = []
+        lines_r = []
+        lines_wb = []
+        lines_w = []
+        for way in range(self.ways):
+            tags = Memory(width=len(tag), depth=sets, name=f"tags{way}")
+            m.submodules[f"tags{way}_r"] = tag_r = tags.read_port(domain="comb")
+            m.submodules[f"tags{way}_w"] = tag_w = tags.write_port()
+            lines = Memory(width=32, depth=sets * words, name=f"lines{way}")
+            m.submodules[f"lines{way}_r"] = line_r = lines.read_port()
+            m.submodules[f"lines{way}_wb"] = line_wb = lines.read_port()
+            m.submodules[f"lines{way}_w"] = line_w = lines.write_port(granularity=8)
+
+            hit = Signal(name=f"hit{way}")
+            m.d.comb += [
+                tag_r.addr.eq(set_),
+                hit.eq(idle & valid[way].bit_select(set_, 1) & (tag_r.data == tag)),
+                tag_w.addr.eq(miss_set),
+                tag_w.data.eq(miss_tag),
+                line_r.addr.eq(Cat(word, set_)),
+            ]
+            hits.append(hit)
+            tags_r.append(tag_r)
+            tags_w.append(tag_w)
+            lines_r.append(line_r)
+            lines_wb.append(line_wb)
+            lines_w.append(line_w)
+
+        hit = Signal()
+        hit_way = Signal(self._way_shape)
+        m.d.comb += hit.eq(Cat(hits).any())
+        for way in range(self.ways):
+            with m.If(hits[way]):
+                m.d.comb += hit_way.eq(way)
+
+        # === hit ===
+        retried = Signal()
+        resp_way = Signal(self._way_shape)
+        m.d.comb += self.cpu.ready.eq(hit)
+        with m.If(request & hit):
+            m.d.sync += [
+                resp_way.eq(hit_way),
+                retried.eq(0),
+            ]
+            with m.If(~retried):
+                m.d.sync += self.hits.eq(self.hits + 1)
+        for way, line_w in enumerate(lines_w):
+            with m.If(self.cpu.we & hits[way]):
+                m.d.comb += [
+                    line_w.addr.eq(Cat(word, set_)),
+                    line_w.data.eq(self.cpu.wdata),
+                    line_w.en.eq(self.cpu.wstb),
+                ]
+                m.d.sync += dirty[way].bit_select(set_, 1).eq(1)
+        m.d.comb += self.cpu.rdata.eq(Array(line_r.data for line_r in lines_r)[resp_way])
+
+        # === miss ===
+        victim = Signal(self._way_shape)
+        round_robin = Signal(self._way_shape)
+        m.d.comb += victim.eq(round_robin)
+        for way in reversed(range(self.ways)):
+            with m.If(~valid[way].bit_select(set_, 1)):
+                m.d.comb += victim.eq(way)
+
+        victim_tag = Array(tag_r.data for tag_r in tags_r)[victim]
+        victim_dirty = Array(
+            valid[way].bit_select(set_, 1) & dirty[way].bit_select(set_, 1)
+            for way in range(self.ways)
+        )[victim]
+
+        # the victim line's tag while it's written back
+        wb_tag = Signal(len(tag))
+        writing = Signal()
+        wb_data = Array(line_wb.data for line_wb in lines_wb)[miss_way]
+
+        m.d.comb += [
+            self.mem.length.eq(words),
+            self.mem.wstb.eq(0b1111),
+            self.mem.wdata.eq(wb_data),
+        ]
+
+        with m.FSM():
+            with m.State("IDLE"):
+                m.d.comb += idle.eq(1)
+                with m.If(request & ~hit):
+                    m.d.sync += [
+                        miss_addr.eq(self.cpu.addr),
+                        miss_way.eq(victim),
+                        wb_tag.eq(victim_tag),
+                        moved.eq(0),
+                        retried.eq(1),
+                        self.misses.eq(self.misses + 1),
+                    ]
+                    if self.ways > 1:
+                        m.d.sync += round_robin.eq(round_robin + 1)
+                    for way in range(self.ways):
+                        with m.If(victim == way):
+                            m.d.sync += valid[way].bit_select(set_, 1).eq(0)
+                    with m.If(victim_dirty):
+                        m.d.sync += self.writebacks.eq(self.writebacks + 1)
+                        m.next = "WRITEBACK"
+                    with m.Else():
+                        m.next = "REFILL"
+
+            with m.State("WRITEBACK"):
+                m.d.comb += [
+                    self.mem.addr.eq(Cat(C(0, 2 + len(miss_word)), miss_set, wb_tag)),
+                    self.mem.req.eq(1),
+                    self.mem.we.eq(1),
+                ]
+                with m.If(self.mem.ack):
+                    m.next = "WRITEBACK_DATA"
+
+            with m.State("WRITEBACK_DATA"):
+                m.d.comb += writing.eq(1)
+                with m.If(self.mem.wready):
+                    m.d.sync += moved.eq(moved + 1)
+                    with m.If(moved == words - 1):
+                        m.next = "REFILL"
+
+            with m.State("REFILL"):
+                m.d.comb += [
+                    self.mem.addr.eq(Cat(0, 0, miss_addr[2:])),
+                    self.mem.req.eq(1),
+                ]
+                for way, tag_w in enumerate(tags_w):
+                    m.d.comb += tag_w.en.eq(miss_way == way)
+                with m.If(self.mem.ack):
+                    m.next = "REFILL_DATA"
+
+            with m.State("REFILL_DATA"):
+                with m.If(self.mem.rvalid):
+                    m.d.sync += moved.eq(moved + 1)
+                    for way, line_w in enumerate(lines_w):
+                        with m.If(miss_way == way):
+                            m.d.comb += [
+                                line_w.addr.eq(Cat(moving, miss_set)),
+                                line_w.data.eq(self.mem.rdata),
+                                line_w.en.eq(0b1111),
+                            ]
+                    with m.If(moved == words - 1):
+                        for way in range(self.ways):
+                            with m.If(miss_way == way):
+                                m.d.sync += [
+                                    valid[way].bit_select(miss_set, 1).eq(1),
+                                    dirty[way].bit_select(miss_set, 1).eq(0),
+                                ]
+                        m.next = "IDLE"
+
+        # the victim line is read a word ahead, so that each is ready when `mem` takes it.
+        # `moved` wraps to 0 at the end of the write back, ready for the refill
+        wb_next = Signal(len(moved))
+        m.d.comb += wb_next.eq(moved + (writing & self.mem.wready))
+        for line_wb in lines_wb:
+            m.d.comb += line_wb.addr.eq(Cat(wb_next, miss_set))
+
+        return m
@@ -0,0 +1,95 @@
+import random
+
+from amaranth.sim import Settle, Simulator
+import pytest
+
+from snoot4.mem.dcache import DCache
+from snoot4.mem.model import burst_memory
+
+
+def run(accesses, memory, **kwargs):
+    """
+    Run `accesses` (tuples of address, and strobes and data for stores or None for loads)
+    through a `DCache` backed by `memory`. Returns the words loaded and the counters.
+    """
+    dut = DCache(**kwargs)
+    loaded = []
+    counters = {}
+
+    def bench():
+        for addr, wstb, wdata in accesses:
+            yield dut.cpu.addr.eq(addr)
+            yield dut.cpu.re.eq(wstb is None)
+            yield dut.cpu.we.eq(wstb is not None)
+            yield dut.cpu.wstb.eq(wstb or 0)
+            yield dut.cpu.wdata.eq(wdata or 0)
+            while True:
+                yield Settle()
+                ready = yield dut.cpu.ready
+                yield
+                if ready:
+                    break
+            yield dut.cpu.re.eq(0)
+            yield dut.cpu.we.eq(0)
+            yield Settle()
+            if wstb is None:
+                loaded.append((yield dut.cpu.rdata))
+
+        for counter in ["hits", "misses", "writebacks"]:
+            counters[counter] = yield getattr(dut, counter)
+
+    sim = Simulator(dut)
+    sim.add_clock(1e-6)
+    sim.add_sync_process(burst_memory(dut.mem, memory, latency=4))
+    sim.add_sync_process(bench)
+    sim.run()
+    return loaded, counters
+
+
+def _merge(word, wstb, wdata):
+    for lane in range(4):
+        if (wstb >> lane) & 1:
+            mask = 0xFF << (lane * 8)
+            word = (word & ~mask) | (wdata & mask)
+    return word
+
+
+@pytest.mark.parametrize("ways", [1, 2])
+def test_random(ways):
+    # a cache of 4 lines over 16 lines of memory, so most accesses miss and most misses
+    # write back a dirty line. every word is loaded at the end, which sees what's in
+    # memory and what's still in the cache together
+    rng = random.Random(ways)
+    addrs = range(0, 0x100, 4)
+    memory = {addr: rng.getrandbits(32) for addr in addrs}
+    reference = dict(memory)
+
+    accesses = []
+    expected = []
+    for _ in range(200):
+        addr = rng.choice(addrs)
+        if rng.random() < 0.5:
+            wstb, wdata = rng.randrange(1, 16), rng.getrandbits(32)
+            reference[addr] = _merge(reference[addr], wstb, wdata)
+            accesses.append((addr, wstb, wdata))
+        else:
+            accesses.append((addr, None, None))
+            expected.append(reference[addr])
+    for addr in addrs:
+        accesses.append((addr, None, None))
+        expected.append(reference[addr])
+
+    loaded, counters = run(accesses, memory, size=64, line=16, ways=ways)
+    assert loaded == expected
+    assert counters["hits"] + counters["misses"] == len(accesses)
+    assert counters["writebacks"] > 0
+
+
+def test_locality():
+    # stores allocate, so everything after the first access to each line hits
+    accesses = [(addr, 0b1111, addr) for addr in range(0, 0x40, 4)]
+    accesses += [(addr, None, None) for addr in range(0, 0x40, 4)]
+    loaded, counters = run(accesses, {}, size=256, line=32, ways=2)
+    assert loaded == list(range(0, 0x40, 4))
+    assert counters["misses"] == 2
+    assert counters["writebacks"] == 0
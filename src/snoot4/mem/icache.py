@@ -0,0 +1,165 @@
+from amaranth import Array, Cat, Memory, Module, Mux, Signal
+from amaranth.lib.wiring import In, Out
+
+from snoot4.fe.fetch import InstructionBus
+from snoot4.mem import BurstBus
+from snoot4.mem.cache import Cache
+
+
+class ICache(Cache):
+    """
+    Instruction cache serving `Fetch` on `cpu`, and refilling from `mem`.
+
+    Tags are looked up as the request arrives, so a hit is accepted straight away and its
+    word returned the cycle after like any other `InstructionBus`. A miss holds `ready` low
+    while the line is refilled critical word first: the missed word is passed through as it
+    arrives, and the rest of the line can be hit as soon as each of its words is in.
+
+    Victims are invalid ways if there are any, and otherwise picked round robin.
+    `invalidate` empties the whole cache. `hits` counts requests served from the cache, and
+    `misses` the lines refilled, both from reset.
+    """
+
+    def __init__(self, *, size=8192, line=32, ways=2):
+        super().__init__(
+            {
+                "cpu": In(InstructionBus),
+                "mem": Out(BurstBus),
+                "invalidate": In(1),
+                "hits": Out(32),
+                "misses": Out(32),
+            },
+            size=size,
+            line=line,
+            ways=ways,
+        )
+
+    def elaborate(self, platform):
+        m = Module()
+        words = self.line // 4
+        sets = 1 << self._set_bits
+        word, set_, tag = self._split(self.cpu.addr)
+
+        # === refill ===
+        refilling = Signal()
+        requesting = Signal()
+        refill_addr = Signal(32)
+        refill_way = Signal(self._way_shape)
+        received = Signal(range(words))
+        filled = Signal(words)
+
+        refill_word, refill_set, refill_tag = self._split(refill_addr)
+        # the address of the word on `mem.rdata`, which wraps around within the line
+        arriving = Signal(32)
+        m.d.comb += arriving.eq(
+            Cat(0, 0, (refill_word + received)[: len(refill_word)], refill_set, refill_tag)
+        )
+        arriving_word, _, _ = self._split(arriving)
+
+        m.d.comb += [
+            self.mem.addr.eq(refill_addr),
+            self.mem.req.eq(requesting),
+            self.mem.length.eq(words),
+        ]
+        with m.If(self.mem.req & self.mem.ack):
+            m.d.sync += requesting.eq(0)
+
+        storing = refilling & ~requesting & self.mem.rvalid
+        with m.If(storing):
+            m.d.sync += [
+                received.eq(received + 1),
+                filled.bit_select(arriving_word, 1).eq(1),
+            ]
+            with m.If(received == words - 1):
+                m.d.sync += refilling.eq(0)
+
+        # === lookup ===
+        valid = [Signal(sets, name=f"valid{way}") for way in range(self.ways)]
+        hits = []
+        data = []
+        for way in range(self.ways):
+            tags = Memory(width=len(tag), depth=sets, name=f"tags{way}")
+            m.submodules[f"tags{way}_r"] = tags_r = tags.read_port(domain="comb")
+            m.submodules[f"tags{way}_w"] = tags_w = tags.write_port()
+            lines = Memory(width=32, depth=sets * words, name=f"lines{way}")
+            m.submodules[f"lines{way}_r"] = lines_r = lines.read_port()
+            m.submodules[f"lines{way}_w"] = lines_w = lines.write_port()
+
+            # words of the line being refilled can only hit once they're in
+            in_refill = refilling & (refill_way == way) & (refill_set == set_)
+            hit = Signal(name=f"hit{way}")
+            m.d.comb += [
+                tags_r.addr.eq(set_),
+                hit.eq(
+                    valid[way].bit_select(set_, 1)
+                    & (tags_r.data == tag)
+                    & ~(in_refill & ~filled.bit_select(word, 1))
+                ),
+                tags_w.addr.eq(set_),
+                tags_w.data.eq(tag),
+                lines_r.addr.eq(Cat(word, set_)),
+                lines_w.addr.eq(Cat(arriving_word, refill_set)),
+                lines_w.data.eq(self.mem.rdata),
+                lines_w.en.eq(storing & (refill_way == way)),
+            ]
+            hits.append(hit)
+            data.append((lines_r.data, tags_w))
+
+        hit = Signal()
+        m.d.comb += hit.eq(Cat(hits).any())
+
+        # the missed word can be taken as it arrives
+        passing = Signal()
+        m.d.comb += passing.eq(storing & (self.cpu.addr[2:] == arriving[2:]))
+
+        # === miss ===
+        victim = Signal(self._way_shape)
+        round_robin = Signal(self._way_shape)
+        m.d.comb += victim.eq(round_robin)
+        for way in reversed(range(self.ways)):
+            with m.If(~valid[way].bit_select(set_, 1)):
+                m.d.comb += victim.eq(way)
+
+        with m.If(self.cpu.re & ~hit & ~passing & ~refilling & ~self.invalidate):
+            m.d.sync += [
+                refilling.eq(1),
+                requesting.eq(1),
+                refill_addr.eq(Cat(0, 0, self.cpu.addr[2:])),
+                refill_way.eq(victim),
+                received.eq(0),
+                filled.eq(0),
+                self.misses.eq(self.misses + 1),
+            ]
+            if self.ways > 1:
+                m.d.sync += round_robin.eq(round_robin + 1)
+            for way, (_, tags_w) in enumerate(data):
+                with m.If(victim == way):
+                    m.d.comb += tags_w.en.eq(1)
+                    m.d.sync += valid[way].bit_select(set_, 1).eq(1)
+
+        with m.If(self.invalidate):
+            m.d.sync += [valid[way].eq(0) for way in range(self.ways)]
+
+        # === response ===
+        hit_way = Signal(self._way_shape)
+        for way in range(self.ways):
+            with m.If(hits[way]):
+                m.d.comb += hit_way.eq(way)
+
+        resp_way = Signal(self._way_shape)
+        resp_passed = Signal()
+        passed = Signal(32)
+        m.d.comb += self.cpu.ready.eq((hit | passing) & ~self.invalidate)
+        with m.If(self.cpu.re & self.cpu.ready):
+            m.d.sync += [
+                resp_way.eq(hit_way),
+                resp_passed.eq(passing),
+                passed.eq(self.mem.rdata),
+            ]
+            with m.If(hit):
+                m.d.sync += self.hits.eq(self.hits + 1)
+        m.d.comb += self.cpu.rdata.eq(
+            Mux(resp_passed, passed, Array(lines_r for lines_r, _ in data)[resp_way])
+        )
+
+        return m
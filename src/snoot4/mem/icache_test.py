@@ -0,0 +1,27 @@
+import pytest
+
+from snoot4.mem.model import simulate_icache
+
+
+def test_loop():
+    # a loop over two lines misses once per line, and every word fetched on the way
+    # through the refill is passed straight through
+    loop = [0x100 + 4 * i for i in range(16)]
+    result = simulate_icache(loop * 4, size=256, line=32, ways=2)
+    assert result["misses"] == 2
+    assert result["hits"] == len(loop) * 3
+
+
+def test_critical_word_first():
+    # the word asked for comes back with the first beat of the refill, wherever it is in
+    # the line
+    for addr in [0x100, 0x11C]:
+        result = simulate_icache([addr], size=256, line=32, ways=2, latency=8)
+        assert result["latency"] == 1 + 1 + 8
+
+
+@pytest.mark.parametrize("ways,misses", [(1, 16), (2, 2), (4, 2)])
+def test_conflicts(ways, misses):
+    # two lines that map to the same set
+    result = simulate_icache([0x0, 0x400] * 8, size=256, line=32, ways=ways)
+    assert result["misses"] == misses
@@ -0,0 +1,188 @@
+from collections import deque
+
+from amaranth.sim import Passive, Settle, Simulator
+
+from snoot4.mem.icache import ICache
+from snoot4.mem.wishbone import WishboneMaster
+
+
+def _merge(word, wstb, wdata):
+    for lane in range(4):
+        if (wstb >> lane) & 1:
+            mask = 0xFF << (lane * 8)
+            word = (word & ~mask) | (wdata & mask)
+    return word
+
+
+def burst_memory(bus, memory, *, latency=8):
+    """
+    Returns a process simulating external memory on the `BurstBus` `bus`, holding `memory`
+    (a dict of big endian words by address). The first word of a burst moves `latency`
+    cycles after it's accepted, and the rest one per cycle after that. Add it to the
+    simulator before any process that reacts to it.
+    """
+
+    def process():
+        yield Passive()
+        while True:
+            yield Settle()
+            if not (yield bus.req):
+                yield
+                continue
+
+            addr = (yield bus.addr) & ~3
+            we = yield bus.we
+            length = yield bus.length
+            yield bus.ack.eq(1)
+            yield
+            yield bus.ack.eq(0)
+            for _ in range(latency - 1):
+                yield
+
+            size = length * 4
+            base = addr & ~(size - 1)
+            for i in range(length):
+                word_addr = base + (addr - base + i * 4) % size
+                if we:
+                    yield bus.wready.eq(1)
+                    yield Settle()
+                    wstb, wdata = (yield bus.wstb), (yield bus.wdata)
+                    memory[word_addr] = _merge(memory.get(word_addr, 0), wstb, wdata)
+                else:
+                    yield bus.rdata.eq(memory.get(word_addr, 0))
+                    yield bus.rvalid.eq(1)
+                yield
+            yield bus.wready.eq(0)
+            yield bus.rvalid.eq(0)
+
+    return process
+
+
+def wishbone_memory(bus, memory, *, latency=4, stall=lambda cycle: False):
+    """
+    Returns a process simulating a pipelined Wishbone slave on `bus`, holding `memory` (a
+    dict of big endian words by address). Each request is acknowledged `latency` cycles
+    after it's accepted, in order and at most one a cycle, and requests are stalled on the
+    cycles `stall(cycle)` is true. Add it to the simulator before any process that reacts
+    to it.
+    """
+
+    def process():
+        yield Passive()
+        pending = deque()
+        cycle = 0
+        while True:
+            cycle += 1
+            ack = bool(pending) and pending[0][0] <= cycle
+            data = pending.popleft()[1] if ack else 0
+            stalled = stall(cycle)
+            yield bus.ack.eq(ack)
+            yield bus.dat_r.eq(data)
+            yield bus.stall.eq(stalled)
+            yield Settle()
+
+            if (yield bus.cyc) and (yield bus.stb) and not stalled:
+                addr = (yield bus.adr) << 2
+                if (yield bus.we):
+                    sel, dat_w = (yield bus.sel), (yield bus.dat_w)
+                    memory[addr] = _merge(memory.get(addr, 0), sel, dat_w)
+                    pending.append((cycle + latency, 0))
+                else:
+                    pending.append((cycle + latency, memory.get(addr, 0)))
+            yield
+
+    return process
+
+
+def simulate_wishbone(bursts, *, length=8, latency=4, depth=4, stall=lambda cycle: False):
+    """
+    Read `bursts` bursts of `length` words back to back through a `WishboneMaster` of
+    `depth`, from a slave `latency` cycles away. Checks every word read, and returns the
+    sustained bandwidth in words a cycle.
+    """
+    dut = WishboneMaster(depth=depth)
+    # every word holds its own address
+    memory = {addr: addr for addr in range(0, bursts * length * 4, 4)}
+    result = {}
+
+    def bench():
+        cycles = 0
+        for burst in range(bursts):
+            addr = burst * length * 4
+            yield dut.bus.addr.eq(addr)
+            yield dut.bus.length.eq(length)
+            yield dut.bus.req.eq(1)
+            words = []
+            while len(words) < length:
+                cycles += 1
+                yield Settle()
+                accepted = yield dut.bus.ack
+                if (yield dut.bus.rvalid):
+                    words.append((yield dut.bus.rdata))
+                yield
+                if accepted:
+                    yield dut.bus.req.eq(0)
+            assert words == list(range(addr, addr + length * 4, 4))
+
+        result.update(
+            {
+                "words": bursts * length,
+                "cycles": cycles,
+                "bandwidth": bursts * length / cycles,
+            }
+        )
+
+    sim = Simulator(dut)
+    sim.add_clock(1e-6)
+    sim.add_sync_process(wishbone_memory(dut.wb, memory, latency=latency, stall=stall))
+    sim.add_sync_process(bench)
+    sim.run()
+    return result
+
+
+def simulate_icache(trace, *, latency=8, **kwargs):
+    """
+    Fetch each address of `trace` in turn through an `ICache` made with `kwargs`, backed by
+    memory `latency` cycles away. Checks every word fetched, and returns the hit rate and
+    the average number of cycles from asking for a word to having it.
+    """
+    dut = ICache(**kwargs)
+    # every word holds its own address
+    memory = {addr & ~3: addr & ~3 for addr in trace}
+    result = {}
+
+    def bench():
+        cycles = 0
+        for addr in trace:
+            yield dut.cpu.addr.eq(addr)
+            yield dut.cpu.re.eq(1)
+            while True:
+                cycles += 1
+                yield Settle()
+                ready = yield dut.cpu.ready
+                yield
+                if ready:
+                    break
+            yield dut.cpu.re.eq(0)
+            yield Settle()
+            rdata = yield dut.cpu.rdata
+            assert rdata == addr & ~3, f"fetched {rdata:#x} from {addr:#x}"
+
+        hits = yield dut.hits
+        result.update(
+            {
+                "accesses": len(trace),
+                "hits": hits,
+                "misses": (yield dut.misses),
+                "hit_rate": hits / len(trace),
+                "latency": cycles / len(trace),
+            }
+        )
+
+    sim = Simulator(dut)
+    sim.add_clock(1e-6)
+    # memory goes first, so that the bench sees what it drives in the same cycle
+    sim.add_sync_process(burst_memory(dut.mem, memory, latency=latency))
+    sim.add_sync_process(bench)
+    sim.run()
+    return result
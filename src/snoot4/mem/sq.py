@@ -0,0 +1,106 @@
+from amaranth import Array, C, Cat, Module, Signal
+from amaranth.lib.wiring import Component, In, Out
+
+from snoot4.mem import BurstBus
+
+WORDS = 8
+
+
+def isStoreQueue(addr):
+    """Whether `addr` is in the store queue area, 0xE0000000 to 0xE3FFFFFF."""
+    return addr[26:32] == 0b111000
+
+
+class StoreQueue(Component):
+    """
+    The SH-4's two 32 byte store queues, SQ0 and SQ1. Stores to the store queue area go
+    into SQ0 or SQ1 (by bit 5 of their address) with the `wstb` and `wdata` `MemoryWrite`
+    makes of them, and `pref` with an address in the area flushes that queue to memory as a
+    single burst.
+
+    The burst goes to bits 5 to 25 of the `pref` address, with bits 26 to 28 from `qacr0` or
+    `qacr1` (QACR0 and QACR1 bits 2 to 4). Only the bytes stored since the last flush are
+    written, so a queue holding a few small stores doesn't clobber the rest of the line.
+
+    One queue can be filled while the other is flushed. Storing to a queue that's being
+    flushed, or asking for a flush while one's already going, holds `ready` low until it's
+    done. `stores` and `bursts` count from reset.
+    """
+
+    addr: In(32)
+    we: In(1)
+    wstb: In(4)
+    wdata: In(32)
+    pref: In(1)
+    ready: Out(1)
+
+    qacr0: In(3)
+    qacr1: In(3)
+
+    mem: Out(BurstBus)
+
+    stores: Out(32)
+    bursts: Out(32)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        queues = [[Signal(32, name=f"sq{q}_{i}") for i in range(WORDS)] for q in range(2)]
+        masks = [[Signal(4, name=f"sq{q}_{i}_mask") for i in range(WORDS)] for q in range(2)]
+        queue = self.addr[5]
+        index = self.addr[2:5]
+
+        # === flush ===
+        flushing = Signal()
+        requesting = Signal()
+        flush_queue = Signal()
+        flush_addr = Signal(32)
+        moved = Signal(range(WORDS))
+
+        m.d.comb += [
+            self.mem.addr.eq(flush_addr),
+            self.mem.req.eq(requesting),
+            self.mem.we.eq(1),
+            self.mem.length.eq(WORDS),
+            self.mem.wdata.eq(Array(Array(q) for q in queues)[flush_queue][moved]),
+            self.mem.wstb.eq(Array(Array(q) for q in masks)[flush_queue][moved]),
+        ]
+        with m.If(self.mem.req & self.mem.ack):
+            m.d.sync += requesting.eq(0)
+        with m.If(flushing & ~requesting & self.mem.wready):
+            m.d.sync += moved.eq(moved + 1)
+            with m.If(moved == WORDS - 1):
+                m.d.sync += flushing.eq(0)
+                for q in range(2):
+                    with m.If(flush_queue == q):
+                        m.d.sync += [mask.eq(0) for mask in masks[q]]
+
+        busy = flushing & (flush_queue == queue)
+        m.d.comb += self.ready.eq(~(self.we & busy) & ~(self.pref & flushing))
+
+        with m.If(self.pref & self.ready):
+            qacr = Array([self.qacr0, self.qacr1])[queue]
+            m.d.sync += [
+                flushing.eq(1),
+                requesting.eq(1),
+                flush_queue.eq(queue),
+                flush_addr.eq(Cat(C(0, 5), self.addr[5:26], qacr)),
+                moved.eq(0),
+                self.bursts.eq(self.bursts + 1),
+            ]
+
+        # === store ===
+        with m.If(self.we & self.ready):
+            for q in range(2):
+                for i in range(WORDS):
+                    with m.If((queue == q) & (index == i)):
+                        word, mask = queues[q][i], masks[q][i]
+                        for lane in range(4):
+                            with m.If(self.wstb[lane]):
+                                m.d.sync += word[8 * lane : 8 * (lane + 1)].eq(
+                                    self.wdata[8 * lane : 8 * (lane + 1)]
+                                )
+                        m.d.sync += mask.eq(mask | self.wstb)
+            m.d.sync += self.stores.eq(self.stores + 1)
+
+        return m
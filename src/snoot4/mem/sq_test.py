@@ -0,0 +1,97 @@
+from amaranth.sim import Settle, Simulator
+
+from snoot4.mem.model import burst_memory
+from snoot4.mem.sq import StoreQueue
+
+
+def run(accesses, memory, *, qacr=(0, 0)):
+    """
+    Run `accesses` (tuples of "store", address, strobes and data, or "pref" and address)
+    through a `StoreQueue` in front of `memory`, until its last burst is done. Returns the
+    cycles each access waited, and the counters.
+    """
+    dut = StoreQueue()
+    waits = []
+    counters = {}
+
+    def bench():
+        yield dut.qacr0.eq(qacr[0])
+        yield dut.qacr1.eq(qacr[1])
+        for kind, addr, *store in accesses:
+            wstb, wdata = store or (0, 0)
+            yield dut.addr.eq(addr)
+            yield dut.we.eq(kind == "store")
+            yield dut.pref.eq(kind == "pref")
+            yield dut.wstb.eq(wstb)
+            yield dut.wdata.eq(wdata)
+            waited = 0
+            while True:
+                yield Settle()
+                ready = yield dut.ready
+                yield
+                if ready:
+                    break
+                waited += 1
+            waits.append(waited)
+        yield dut.we.eq(0)
+        yield dut.pref.eq(0)
+
+        # a flush asked for while another is going waits for it, so this waits for the last
+        yield dut.pref.eq(1)
+        while True:
+            yield Settle()
+            if (yield dut.ready):
+                break
+            yield
+        yield dut.pref.eq(0)
+
+        for counter in ["stores", "bursts"]:
+            counters[counter] = yield getattr(dut, counter)
+
+    sim = Simulator(dut)
+    sim.add_clock(1e-6)
+    sim.add_sync_process(burst_memory(dut.mem, memory, latency=4))
+    sim.add_sync_process(bench)
+    sim.run()
+    return waits, counters
+
+
+def test_burst():
+    memory = {addr: 0x11111111 for addr in range(0x0C000000, 0x0C000040, 4)}
+    accesses = [
+        # SQ0: a long, a word and a byte, the rest of the line is left as it was
+        ("store", 0xE0000000, 0b1111, 0x01234567),
+        ("store", 0xE0000004, 0b1100, 0x89AB0000),
+        ("store", 0xE000001C, 0b0001, 0x000000EF),
+        ("pref", 0xE0000000),
+        # SQ1 fills while SQ0 is flushed, to the next line
+        *(("store", 0xE0000020 + i * 4, 0b1111, i) for i in range(8)),
+        ("pref", 0xE0000020),
+    ]
+
+    waits, counters = run(accesses, memory, qacr=(0b011, 0b011))
+    assert memory[0x0C000000] == 0x01234567
+    assert memory[0x0C000004] == 0x89AB1111
+    assert memory[0x0C000008] == 0x11111111
+    assert memory[0x0C00001C] == 0x111111EF
+    assert [memory[0x0C000020 + i * 4] for i in range(8)] == list(range(8))
+    assert counters == {"stores": 11, "bursts": 2}
+    # the only wait is the second flush, for the first
+    assert waits[:-1] == [0] * (len(accesses) - 1)
+    assert waits[-1] > 0
+
+
+def test_busy():
+    # storing to the queue that's being flushed waits for the flush, and the flush sends
+    # what was there before the store
+    memory = {}
+    accesses = [
+        ("store", 0xE0000000, 0b1111, 0xAAAAAAAA),
+        ("pref", 0xE0000000),
+        ("store", 0xE0000000, 0b1111, 0xBBBBBBBB),
+    ]
+
+    waits, counters = run(accesses, memory)
+    assert memory[0x00000000] == 0xAAAAAAAA
+    assert waits[2] > 0
+    assert counters == {"stores": 2, "bursts": 1}
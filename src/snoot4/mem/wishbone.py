@@ -0,0 +1,110 @@
+from amaranth import Module, Mux, Signal
+from amaranth.lib.wiring import Component, In, Out, Signature
+
+from snoot4.mem import BurstBus
+
+# Wishbone B4 pipelined mode, with 32 bit data, byte granularity and `adr` addressing words
+WishboneBus = Signature(
+    {
+        "cyc": Out(1),
+        "stb": Out(1),
+        "we": Out(1),
+        "adr": Out(30),
+        "sel": Out(4),
+        "dat_w": Out(32),
+        "dat_r": In(32),
+        "ack": In(1),
+        "stall": In(1),
+    }
+)
+
+
+class WishboneMaster(Component):
+    """
+    Turns each burst on `bus` into a Wishbone B4 pipelined cycle on `wb`, with a word a cycle
+    issued until `depth` of them are waiting for their `ack`. Burst lengths are powers of
+    two.
+
+    Bursts are accepted one at a time, and the next only once the last word of the one
+    before has been acknowledged. `bursts` and `words` count from reset, and `busy` counts
+    the cycles `cyc` was set.
+    """
+
+    bus: In(BurstBus)
+    wb: Out(WishboneBus)
+
+    bursts: Out(32)
+    words: Out(32)
+    busy: Out(32)
+
+    def __init__(self, *, depth=4):
+        if depth < 1:
+            raise ValueError(f"depth must be at least 1, not {depth}")
+        self.depth = depth
+        super().__init__()
+
+    def elaborate(self, platform):
+        m = Module()
+
+        active = Signal()
+        we = Signal()
+        start = Signal(30)
+        mask = Signal(30)
+        issued = Signal(9)
+        acked = Signal(9)
+        outstanding = Signal(range(self.depth + 1))
+
+        # === request ===
+        m.d.comb += self.bus.ack.eq(~active)
+        with m.If(self.bus.req & self.bus.ack):
+            m.d.sync += [
+                active.eq(1),
+                we.eq(self.bus.we),
+                start.eq(self.bus.addr[2:]),
+                mask.eq(self.bus.length - 1),
+                issued.eq(0),
+                acked.eq(0),
+                outstanding.eq(0),
+                self.bursts.eq(self.bursts + 1),
+            ]
+
+        # === response ===
+        returned = active & self.wb.ack
+        m.d.comb += [
+            self.bus.rvalid.eq(returned & ~we),
+            self.bus.rdata.eq(self.wb.dat_r),
+        ]
+
+        # === issue ===
+        # words wrap around within the burst's naturally aligned block, and a word being
+        # acknowledged makes room for another straight away
+        length = mask + 1
+        issuing = Signal()
+        accepted = Signal()
+        m.d.comb += [
+            issuing.eq(
+                active & (issued < length) & ((outstanding < self.depth) | returned)
+            ),
+            accepted.eq(issuing & ~self.wb.stall),
+            self.wb.cyc.eq(active),
+            self.wb.stb.eq(issuing),
+            self.wb.we.eq(we),
+            self.wb.adr.eq((start & ~mask) | ((start + issued) & mask)),
+            self.wb.sel.eq(Mux(we, self.bus.wstb, 0b1111)),
+            self.wb.dat_w.eq(self.bus.wdata),
+            self.bus.wready.eq(accepted & we),
+        ]
+
+        with m.If(active):
+            m.d.sync += [
+                issued.eq(issued + accepted),
+                acked.eq(acked + returned),
+                outstanding.eq(outstanding + accepted - returned),
+                self.busy.eq(self.busy + 1),
+            ]
+            with m.If(returned & (acked == mask)):
+                m.d.sync += active.eq(0)
+        with m.If(returned):
+            m.d.sync += self.words.eq(self.words + 1)
+
+        return m
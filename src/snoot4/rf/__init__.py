@@ -21,17 +21,57 @@ CsrWritePort = WritePort(addr_width=3)
 
 
 class RegisterFile(Component):
-    bank: In(1)
+    """
+    Each of the `pipes` execute pipes has two read ports and two write ports on the active
+    bank: `ra`, `rb`, `rd` and `re` for the first pipe, then `ra1`, `rb1`, `rd1` and `re1`
+    for the second and so on. Core write ports never write the same register in the same
+    cycle.
+    """
 
-    ra: Out(CoreReadPort)
-    rb: Out(CoreReadPort)
-    r0: Out(32)
+    def __init__(self, *, pipes=1):
+        self.pipes = pipes
 
-    rd: In(CoreWritePort)
-    re: In(CoreWritePort)
+        members = {"bank": In(1)}
+        for pipe in range(pipes):
+            suffix = str(pipe) if pipe else ""
+            members.update(
+                {
+                    f"ra{suffix}": Out(CoreReadPort),
+                    f"rb{suffix}": Out(CoreReadPort),
+                }
+            )
+        members["r0"] = Out(32)
+        for pipe in range(pipes):
+            suffix = str(pipe) if pipe else ""
+            members.update(
+                {
+                    f"rd{suffix}": In(CoreWritePort),
+                    f"re{suffix}": In(CoreWritePort),
+                }
+            )
+        members.update(
+            {
+                "csr_r": Out(CsrReadPort),
+                "csr_w": In(CsrWritePort),
+            }
+        )
+        super().__init__(members)
+
+    @property
+    def core_read_ports(self):
+        return [
+            getattr(self, f"{name}{pipe or ''}")
+            for pipe in range(self.pipes)
+            for name in ("ra", "rb")
+        ]
 
-    csr_r: Out(CsrReadPort)
-    csr_w: In(CsrWritePort)
+    @property
+    def core_write_ports(self):
+        return [
+            getattr(self, f"{name}{pipe or ''}")
+            for pipe in range(self.pipes)
+            for name in ("rd", "re")
+        ]
 
     def elaborate(self, platform):
         raise NotImplementedError(
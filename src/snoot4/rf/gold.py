@@ -1,5 +1,8 @@
-from amaranth import Array, Module, Signal
+import itertools
+
+from amaranth import Array, Fragment, Module, ResetSignal, Signal
 from amaranth.hdl.dsl import Assume, Assert
+from amaranth.lib.wiring import In
 
 from snoot4.rf import ADDR_R0, RegisterFile
 
@@ -35,18 +38,18 @@ class RegisterFileGold(RegisterFile):
             m.d.comb += regs_next[i].eq(regs[i])
 
         # core writes never conflict (CSR writes can't conflict)
-        m.d.comb += Assume(~(self.rd.en & self.re.en & (self.rd.addr == self.re.addr)))
+        for a, b in itertools.combinations(self.core_write_ports, 2):
+            m.d.comb += Assume(~(a.en & b.en & (a.addr == b.addr)))
 
         # write before read
-        with m.If(self.rd.en):
-            m.d.comb += _reg(self.bank, self.rd.addr).eq(self.rd.data)
-        with m.If(self.re.en):
-            m.d.comb += _reg(self.bank, self.re.addr).eq(self.re.data)
+        for port in self.core_write_ports:
+            with m.If(port.en):
+                m.d.comb += _reg(self.bank, port.addr).eq(port.data)
         with m.If(self.csr_w.en):
             m.d.comb += _reg(~self.bank, self.csr_w.addr).eq(self.csr_w.data)
 
-        m.d.sync += self.ra.data.eq(_reg(self.bank, self.ra.addr))
-        m.d.sync += self.rb.data.eq(_reg(self.bank, self.rb.addr))
+        for port in self.core_read_ports:
+            m.d.sync += port.data.eq(_reg(self.bank, port.addr))
         m.d.sync += self.r0.eq(_reg(self.bank, ADDR_R0))
         m.d.sync += self.csr_r.data.eq(_reg(~self.bank, self.csr_r.addr))
 
@@ -55,3 +58,85 @@ class RegisterFileGold(RegisterFile):
             m.d.sync += regs[i].eq(regs_next[i])
 
         return m
+
+
+def _flow(signature, path):
+    # direction of a (possibly nested) port. unlike `Signature.flatten`, this accounts for
+    # the port being part of a flipped interface
+    for name in path:
+        member = signature.members[name]
+        if member.is_signature:
+            signature = member.signature
+    return member.flow
+
+
+class RegisterFileEquivalence(RegisterFile):
+    """
+    Drives a `RegisterFile` implementation and `RegisterFileGold` from the same inputs and
+    asserts that their outputs always match.
+
+    With `match_state`, every register of `RegisterFileGold` must have a register of the
+    same name in the implementation, and the two are also asserted equal. This makes the
+    property inductive: a k-induction proof with k = 1 then covers every reachable state,
+    not just the first `depth` cycles. Without it, only a bounded proof is practical.
+
+    Without `reset`, the registers are assumed to never be reset, for implementations whose
+    registers can't be (such as those in memories). The SH-4 leaves them undefined after a
+    reset anyway.
+    """
+
+    def __init__(self, impl_cls, *, pipes=1, match_state=True, reset=True):
+        self.impl_cls = impl_cls
+        self.match_state = match_state
+        self.reset = reset
+        super().__init__(pipes=pipes)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        gold = RegisterFileGold(pipes=self.pipes)
+        impl = self.impl_cls(pipes=self.pipes)
+        gold_frag = Fragment.get(gold, platform)
+        impl_frag = Fragment.get(impl, platform)
+        m.submodules.gold = gold_frag
+        m.submodules.impl = impl_frag
+
+        if not self.reset:
+            m.d.comb += Assume(~ResetSignal())
+
+        # === ports ===
+        ports = zip(
+            self.signature.flatten(self),
+            gold.signature.flatten(gold),
+            impl.signature.flatten(impl),
+        )
+        for (path, _, value), (_, _, gold_value), (_, _, impl_value) in ports:
+            if _flow(self.signature, path) == In:
+                m.d.comb += [
+                    gold_value.eq(value),
+                    impl_value.eq(value),
+                ]
+            else:
+                m.d.comb += [
+                    value.eq(gold_value),
+                    Assert(impl_value == gold_value),
+                ]
+
+        # === state ===
+        if self.match_state:
+            gold_state = {s.name: s for s in gold_frag.drivers.get("sync", [])}
+            impl_state = {s.name: s for s in impl_frag.drivers.get("sync", [])}
+
+            # a register missing from the implementation would silently leave the property
+            # non-inductive, and the proof would never finish
+            missing = gold_state.keys() - impl_state.keys()
+            if missing:
+                raise ValueError(
+                    f"{self.impl_cls.__name__} has no registers named "
+                    f"{', '.join(sorted(missing))}"
+                )
+
+            for name, gold_signal in gold_state.items():
+                m.d.comb += Assert(impl_state[name] == gold_signal)
+
+        return m
@@ -0,0 +1,90 @@
+from amaranth import Array, Memory, Module, Signal
+
+from snoot4.rf import ADDR_R0, RegisterFile
+
+_DEPTH = 24
+
+
+class RegisterFileMem(RegisterFile):
+    """
+    Register file built from memories rather than flip-flops, so that it maps onto block or
+    distributed RAM.
+
+    FPGA RAMs have a single write port, so each write port (`rd` and `re` of every pipe, and
+    `csr_w`) writes a memory of its own, and a small live value table of flip-flops tracks
+    which of them last wrote each register. Each of those memories is replicated once per
+    read port (`ra` and `rb` of every pipe, `r0` and `csr_r`), so that every copy is a
+    simple dual-port RAM.
+    """
+
+    def elaborate(self, platform):
+        m = Module()
+
+        def _index(bank, addr):
+            # same order as RegisterFileGold: R0-7_BANK0, R0-7_BANK1, R8-15
+            addr_low, addr_is_high = addr[0:3], addr >= 8
+
+            index = Signal(range(_DEPTH))
+            with m.If(addr_is_high):
+                m.d.comb += index.eq(16 + addr_low)
+            with m.Elif(bank == 0):
+                m.d.comb += index.eq(0 + addr_low)
+            with m.Else():  # bank == 1
+                m.d.comb += index.eq(8 + addr_low)
+            return index
+
+        # the core always accesses the active bank, and the CSR unit the inactive bank
+        writes = [
+            *(
+                (port.en, _index(self.bank, port.addr), port.data)
+                for port in self.core_write_ports
+            ),
+            (self.csr_w.en, _index(~self.bank, self.csr_w.addr), self.csr_w.data),
+        ]
+        reads = [
+            *((_index(self.bank, port.addr), port.data) for port in self.core_read_ports),
+            (_index(self.bank, ADDR_R0), self.r0),
+            (_index(~self.bank, self.csr_r.addr), self.csr_r.data),
+        ]
+
+        # === live value table ===
+        # which write port holds the current value of each register. later write ports take
+        # priority, as in RegisterFileGold
+        lvt = Array(Signal(range(len(writes)), name=f"lvt{n}") for n in range(_DEPTH))
+        for port, (en, index, _) in enumerate(writes):
+            with m.If(en):
+                m.d.sync += lvt[index].eq(port)
+
+        def _live(index):
+            # write before read: a register written this cycle is read from the port writing
+            # it, not from the port that wrote it last
+            live = Signal.like(lvt[0])
+            m.d.comb += live.eq(lvt[index])
+            for port, (en, write_index, _) in enumerate(writes):
+                with m.If(en & (write_index == index)):
+                    m.d.comb += live.eq(port)
+            return live
+
+        # === memories ===
+        for read, (read_index, read_data) in enumerate(reads):
+            live = Signal.like(lvt[0], name=f"live{read}")
+            m.d.sync += live.eq(_live(read_index))
+
+            datas = []
+            for port, (en, write_index, write_data) in enumerate(writes):
+                mem = Memory(width=32, depth=_DEPTH, name=f"regs_w{port}_r{read}")
+                m.submodules[f"regs_w{port}_r{read}_w"] = wr = mem.write_port()
+                m.submodules[f"regs_w{port}_r{read}_r"] = rd = mem.read_port(
+                    transparent=True
+                )
+                m.d.comb += [
+                    wr.en.eq(en),
+                    wr.addr.eq(write_index),
+                    wr.data.eq(write_data),
+                    rd.addr.eq(read_index),
+                ]
+                datas.append(rd.data)
+
+            m.d.comb += read_data.eq(Array(datas)[live])
+
+        return m
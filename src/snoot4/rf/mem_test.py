@@ -0,0 +1,16 @@
+from snoot4.rf.gold import RegisterFileEquivalence
+from snoot4.rf.mem import RegisterFileMem
+from snoot4.tests.utils import assertFormal
+
+
+def test_mem_equivalence(tmp_path):
+    # the state of the memories can't be matched against RegisterFileGold, so this can only
+    # be a bounded proof. 3 cycles is enough to write a register, and then read it both on
+    # the bypass path and from the memories
+    assertFormal(
+        RegisterFileEquivalence(RegisterFileMem, match_state=False, reset=False),
+        tmp_path,
+        depth=3,
+        engines=["smtbmc z3"],
+        timeout=300,
+    )
@@ -38,24 +38,21 @@ class RegisterFileSim(RegisterFile):
         # read ports as a write and read of the same register can occur within the same cycle.
         def _read_core(addr):
             data = Signal(32)
-            with m.If(self.re.en & (addr == self.re.addr)):
-                m.d.comb += data.eq(self.re.data)
-            with m.Elif(self.rd.en & (addr == self.rd.addr)):
-                m.d.comb += data.eq(self.rd.data)
-            with m.Else():
-                m.d.comb += data.eq(_read(self.bank, addr))
+            m.d.comb += data.eq(_read(self.bank, addr))
+            for port in self.core_write_ports:
+                with m.If(port.en & (addr == port.addr)):
+                    m.d.comb += data.eq(port.data)
             return data
 
         def _write_core(addr, data):
             _write(self.bank, addr, data)
 
-        m.d.sync += self.ra.data.eq(_read_core(self.ra.addr))
-        m.d.sync += self.rb.data.eq(_read_core(self.rb.addr))
+        for port in self.core_read_ports:
+            m.d.sync += port.data.eq(_read_core(port.addr))
         m.d.sync += self.r0.eq(_read_core(ADDR_R0))
-        with m.If(self.rd.en):
-            _write_core(self.rd.addr, self.rd.data)
-        with m.If(self.re.en):
-            _write_core(self.re.addr, self.re.data)
+        for port in self.core_write_ports:
+            with m.If(port.en):
+                _write_core(port.addr, port.data)
 
         # === CSR ports ===
         # the CSR unit can read and write from the inactive bank. reads and writes can ocurr in the
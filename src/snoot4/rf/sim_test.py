@@ -0,0 +1,25 @@
+from snoot4.rf.gold import RegisterFileEquivalence
+from snoot4.rf.sim import RegisterFileSim
+from snoot4.tests.utils import assertFormal
+
+
+def test_sim_equivalence(tmp_path):
+    # yices gets stuck on the induction step, while z3 proves it in seconds
+    assertFormal(
+        RegisterFileEquivalence(RegisterFileSim),
+        tmp_path,
+        mode="prove",
+        engines=["smtbmc z3"],
+        timeout=300,
+    )
+
+
+def test_sim_equivalence_dual(tmp_path):
+    # two pipes' worth of core ports, as used by a dual issue backend
+    assertFormal(
+        RegisterFileEquivalence(RegisterFileSim, pipes=2),
+        tmp_path,
+        mode="prove",
+        engines=["smtbmc z3"],
+        timeout=300,
+    )
@@ -0,0 +1,121 @@
+import functools
+import hashlib
+import os
+from pathlib import Path
+import shutil
+import string
+import subprocess
+
+from amaranth._toolchain import require_tool
+
+DEFAULT_SIZE = 64 * 1024 * 1024
+
+
+@functools.cache
+def toolVersion(name, flag="--version"):
+    tool = require_tool(name)
+    if flag is None:
+        # for tools that can't report their version, such as sby: hash the program itself
+        with open(shutil.which(tool), "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    cmd = [tool, flag]
+    return subprocess.run(cmd, capture_output=True, text=True).stdout.strip()
+
+
+class ProofCache:
+    """
+    On-disk cache of passing proofs, keyed on the hash of everything that can change the
+    result: the sby config (which embeds the design's RTLIL) and the versions of the tools
+    used to prove it.
+
+    Also remembers which engine won the last portfolio race for each spec. Least recently
+    used proofs and engines are evicted to keep the cache under `size` bytes.
+    """
+
+    def __init__(self, path, size=DEFAULT_SIZE):
+        self.path = Path(path)
+        self.size = size
+
+    @classmethod
+    def default(cls):
+        # SNOOT4_FORMAL_CACHE="" disables caching
+        path = os.environ.get("SNOOT4_FORMAL_CACHE")
+        if path is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+            path = Path(cache_home) / "snoot4" / "formal"
+        if not path:
+            return None
+
+        size = int(os.environ.get("SNOOT4_FORMAL_CACHE_SIZE", DEFAULT_SIZE))
+        return cls(path, size)
+
+    def key(self, config, tools):
+        h = hashlib.sha256()
+        for tool in tools:
+            h.update(tool.encode())
+            h.update(b"\0")
+        h.update(config.encode())
+        return h.hexdigest()
+
+    def get(self, key):
+        entry = self.path / "proofs" / key
+        try:
+            stdout = entry.read_text()
+        except FileNotFoundError:
+            return None
+
+        entry.touch()
+        return stdout
+
+    def put(self, key, stdout):
+        self._write(self.path / "proofs" / key, stdout)
+        self.evict()
+
+    def getEngine(self, name):
+        entry = self.path / "engines" / name
+        try:
+            engine = entry.read_text()
+        except FileNotFoundError:
+            return None
+
+        entry.touch()
+        return engine
+
+    def putEngine(self, name, engine):
+        self._write(self.path / "engines" / name, engine)
+        self.evict()
+
+    def _write(self, path, text):
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # write then rename, so concurrent runners never see a partial entry
+        tmp = path.with_name(f".{path.name}.{os.getpid()}")
+        tmp.write_text(text)
+        tmp.replace(path)
+
+    def evict(self):
+        # proofs used to be stored at the top level, before there were engines to remember
+        for entry in self.path.glob("?" * 64):
+            if entry.is_file() and all(c in string.hexdigits for c in entry.name):
+                entry.unlink(missing_ok=True)
+
+        entries = []
+        for kind in ("proofs", "engines"):
+            if not (self.path / kind).is_dir():
+                continue
+            for entry in (self.path / kind).iterdir():
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.size:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
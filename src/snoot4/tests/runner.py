@@ -0,0 +1,141 @@
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+import importlib
+import itertools
+from pathlib import Path
+import pkgutil
+import tempfile
+import time
+import traceback
+
+import snoot4
+from snoot4.tests import utils
+
+
+def discover():
+    # specs register themselves when their test module is imported
+    for module in pkgutil.walk_packages(snoot4.__path__, prefix="snoot4."):
+        if module.name.endswith("_test"):
+            importlib.import_module(module.name)
+
+    return utils.allSpecs()
+
+
+def _prove(spec, portfolio):
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="snoot4-") as tmp_path:
+        passed, stdout = utils.runFormal(
+            utils.convertFormal(spec()),
+            Path(tmp_path),
+            portfolio=portfolio,
+            name=utils.specName(spec),
+        )
+    return [(passed, stdout, time.perf_counter() - start)]
+
+
+def _proveBatch(specs, portfolio):
+    start = time.perf_counter()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="snoot4-") as tmp_path:
+        # the solver stops at the first failing assertion, so keep going without the
+        # failing specs until the rest pass
+        remaining = list(specs)
+        spec_base = utils.specBase(remaining[0])
+        for attempt in itertools.count():
+            attempt_path = Path(tmp_path) / str(attempt)
+            attempt_path.mkdir()
+
+            uut_rtlil = utils.convertFormal(utils.Batch(remaining)())
+            passed, stdout = utils.runFormal(
+                uut_rtlil,
+                attempt_path,
+                portfolio=portfolio,
+                name=utils.gateName(spec_base.gate_cls, spec_base.gate_kwargs),
+            )
+            if passed:
+                results.update((spec, (True, stdout)) for spec in remaining)
+                break
+
+            failed = utils.failedSpecs(remaining, stdout)
+            if not failed:
+                # the failure wasn't an assertion (e.g. a timeout or a tool error), so it
+                # can't be blamed on any spec in particular: prove the rest one at a time
+                results.update((spec, _prove(spec, portfolio)[0][:2]) for spec in remaining)
+                break
+
+            results.update((spec, (False, stdout)) for spec in failed)
+            remaining = [spec for spec in remaining if spec not in failed]
+            if not remaining:
+                break
+    seconds = time.perf_counter() - start
+
+    # a batch can only be timed as a whole, so its time is reported once
+    return [
+        (*results[spec], seconds if i == 0 else None) for i, spec in enumerate(specs)
+    ]
+
+
+def _groups(specs, batch):
+    if not batch:
+        return [[spec] for spec in specs]
+
+    groups = {}
+    for spec in specs:
+        groups.setdefault(utils.specBase(spec), []).append(spec)
+    return list(groups.values())
+
+
+def _submit(pool, group, portfolio):
+    if len(group) == 1:
+        return pool.submit(_prove, group[0], portfolio)
+    return pool.submit(_proveBatch, group, portfolio)
+
+
+def prove(specs, jobs=None, batch=False, portfolio=False):
+    """
+    Prove each of `specs` on a pool of `jobs` worker processes (by default, one per CPU),
+    yielding `(spec, passed, stdout, seconds)` in the order the proofs complete. With
+    `batch`, all specs of the same gate are checked by a single solver run, whose time is
+    given for the first spec of the batch (the others have `seconds` of None). `portfolio`
+    is passed on to `runFormal`.
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {_submit(pool, group, portfolio): group for group in _groups(specs, batch)}
+        for future in as_completed(futures):
+            group = futures[future]
+            try:
+                results = future.result()
+            except Exception as exc:
+                # e.g. a spec that fails to elaborate, or a missing tool. this only fails the
+                # specs of this group, not the rest of the run
+                stdout = "".join(traceback.format_exception(exc))
+                results = [(False, stdout, None)] * len(group)
+
+            for spec, (passed, stdout, seconds) in zip(group, results):
+                yield spec, passed, stdout, seconds
+
+
+def prefetch(specs, jobs=None, batch=False, portfolio=False):
+    """
+    Start proving each of `specs` in the background. `assertFormal` picks up the result
+    instead of starting its own proof, so tests collected by pytest run in parallel.
+    """
+    pool = ProcessPoolExecutor(max_workers=jobs)
+    for group in _groups(specs, batch):
+        spec_futures = [Future() for _ in group]
+        for spec, spec_future in zip(group, spec_futures):
+            utils._prefetched[spec] = spec_future
+
+        def resolve(future, spec_futures=spec_futures):
+            # exceptions raised by done callbacks are only logged, so the worker's exception
+            # has to be passed on for `assertFormal` to see it
+            exc = future.exception()
+            if exc is not None:
+                for spec_future in spec_futures:
+                    spec_future.set_exception(exc)
+                return
+
+            for spec_future, result in zip(spec_futures, future.result()):
+                spec_future.set_result(result)
+
+        _submit(pool, group, portfolio).add_done_callback(resolve)
+    pool.shutdown(wait=False)
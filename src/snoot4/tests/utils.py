@@ -1,15 +1,24 @@
 import pytest
+import re
 import subprocess
 import textwrap
 
 from amaranth import Fragment, Module
-from amaranth._toolchain import require_tool
+from amaranth._toolchain import has_tool, require_tool
 from amaranth.back import rtlil
-from amaranth.lib.wiring import Component, Out, connect, flipped
+from amaranth.lib.wiring import Component, In, Out, connect, flipped
 
+from snoot4.tests.cache import ProofCache, toolVersion
 
-def Spec(gate_cls):
-    gate = gate_cls()
+_spec_bases = []
+_prefetched = {}
+
+# set by `pytest --formal-portfolio`
+usePortfolio = False
+
+
+def Spec(gate_cls, **kwargs):
+    gate = gate_cls(**kwargs)
     gate._MustUse__used = True
     gate_signature = gate.signature
 
@@ -24,7 +33,7 @@ def Spec(gate_cls):
 
         def elaborate(self, platform):
             m = Module()
-            m.submodules.gate = gate = gate_cls()
+            m.submodules.gate = gate = gate_cls(**kwargs)
             connect(m, flipped(self.ports), gate)
 
             self.spec(m, gate)
@@ -34,24 +43,111 @@ def Spec(gate_cls):
         def spec(self, m, gate):
             raise NotImplementedError("spec method must be implemented in subclass")
 
+    Spec.gate_cls = gate_cls
+    Spec.gate_kwargs = kwargs
+    Spec.gate_signature = gate_signature
+    _spec_bases.append(Spec)
     return Spec
 
 
-def assertFormal(uut, tmp_path):
+def allSpecs():
+    return [spec for spec_base in _spec_bases for spec in spec_base.specs]
+
+
+def specName(spec):
+    return f"{spec.__module__.removeprefix('snoot4.')}.{spec.__qualname__}"
+
+
+def gateName(gate_cls, kwargs={}):
+    name = f"{gate_cls.__module__.removeprefix('snoot4.')}.{gate_cls.__qualname__}"
+    for key, value in kwargs.items():
+        name += f".{key}={getattr(value, 'value', value)}"
+    return name
+
+
+def specBase(spec):
+    return next(spec_base for spec_base in _spec_bases if issubclass(spec, spec_base))
+
+
+def Batch(specs):
+    """
+    Merge `specs`, which must all check the same gate, into a single design that shares one
+    copy of the gate. Each spec's assumptions and assertions only apply while its bit of
+    `en` is set, so one solver run checks every spec.
+    """
+    spec_base = specBase(specs[0])
+    assert all(issubclass(spec, spec_base) for spec in specs)
+
+    class Batch(Component):
+        ports: Out(spec_base.gate_signature)
+        en: In(len(specs))
+
+        def elaborate(self, platform):
+            m = Module()
+            m.submodules.gate = gate = spec_base.gate_cls(**spec_base.gate_kwargs)
+            connect(m, flipped(self.ports), gate)
+
+            # each spec gets a submodule of its own, so that sby reports which spec a failing
+            # assertion belongs to (see `failedSpecs`)
+            for i, spec in enumerate(specs):
+                m.submodules[f"spec_{i}"] = spec_m = Module()
+                with spec_m.If(self.en[i]):
+                    spec.spec(self, spec_m, gate)
+
+            return m
+
+    return Batch
+
+
+def failedSpecs(specs, stdout):
+    # sby reports the hierarchical name of a failing assertion, which includes the
+    # submodule of the spec it belongs to
+    failed = {int(i) for i in re.findall(r"Assert failed in top\.spec_(\d+)\b", stdout)}
+    return [spec for i, spec in enumerate(specs) if i in failed]
+
+
+def convertFormal(uut):
     uut_ports = [value for _, _, value in uut.signature.flatten(uut)]
     uut_frag = Fragment.get(uut, platform="formal").prepare(ports=uut_ports)
-    uut_rtlil = rtlil.convert_fragment(uut_frag)[0]
+    return rtlil.convert_fragment(uut_frag)[0]
+
+
+# engines raced against each other by the portfolio mode, and the tool each one needs
+PORTFOLIO = {
+    "smtbmc yices": "yices-smt2",
+    "smtbmc boolector": "boolector",
+    "smtbmc z3": "z3",
+    "abc bmc3": "yosys-abc",
+    "abc pdr": "yosys-abc",
+}
+# abc has separate engines for bounded and unbounded proofs; smtbmc does both
+_ENGINE_MODES = {"abc bmc3": "bmc", "abc pdr": "prove"}
+
+
+def availableEngines(mode):
+    return [
+        engine
+        for engine, tool in PORTFOLIO.items()
+        if has_tool(tool) and _ENGINE_MODES.get(engine, mode) == mode
+    ]
+
 
+def _sby(uut_rtlil, tmp_path, engines, *, mode, depth, timeout, cache):
+    engines = "\n".join(engines)
+    # without multiclock, each step of `depth` is a whole clock cycle rather than a clock
+    # edge. this also keeps induction from having to reason about the clock of every flop,
+    # which makes even trivially inductive properties very expensive
     config = textwrap.dedent(
-        f"""\
+        """\
         [options]
-        mode bmc
-        depth 1
-        wait on
-        multiclock on
+        mode {mode}
+        depth {depth}
+        wait {wait}
+        multiclock off
+        {timeout}
 
         [engines]
-        smtbmc
+        {engines}
 
         [script]
         read_ilang top.il
@@ -60,15 +156,129 @@ def assertFormal(uut, tmp_path):
         [file top.il]
         {uut_rtlil}
         """
+    ).format(
+        mode=mode,
+        depth=depth,
+        # when racing engines, stop the others as soon as one returns
+        wait="on" if len(engines.splitlines()) == 1 else "off",
+        timeout="" if timeout is None else f"timeout {timeout}",
+        engines=engines,
+        uut_rtlil=uut_rtlil,
     )
 
+    cache = ProofCache.default() if cache else None
+    if cache is not None:
+        tools = [toolVersion("sby", None), toolVersion("yosys", "-V")]
+        for engine in engines.splitlines():
+            solver = PORTFOLIO.get(engine, "yices-smt2")
+            if solver.startswith("yosys"):
+                continue  # same version as yosys
+            tools.append(toolVersion(solver))
+
+        key = cache.key(config, tools)
+        stdout = cache.get(key)
+        if stdout is not None:
+            return 0, stdout
+
+    # every engine must run at the same time for the first result to win the race, even if
+    # there are fewer CPUs than engines. in prove mode, smtbmc runs the base case and the
+    # induction step as two separate processes
+    jobs = sum(
+        2 if mode == "prove" and engine.startswith("smtbmc") else 1
+        for engine in engines.splitlines()
+    )
     with subprocess.Popen(
-        [require_tool("sby"), "-f", "-d", tmp_path],
+        [require_tool("sby"), "-f", "-j", str(jobs), "-d", tmp_path],
         cwd=tmp_path,
         universal_newlines=True,
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
     ) as proc:
         stdout, _ = proc.communicate(config)
-        if proc.returncode != 0:
-            pytest.fail(stdout)
+
+    if proc.returncode == 0 and cache is not None:
+        cache.put(key, stdout)
+    return proc.returncode, stdout
+
+
+def runFormal(
+    uut_rtlil,
+    tmp_path,
+    *,
+    mode="bmc",
+    depth=1,
+    engines=None,
+    portfolio=False,
+    name=None,
+    timeout=None,
+    cache=True,
+):
+    """
+    Prove `uut_rtlil`, returning whether it passed and the output of sby. `mode` is either
+    "bmc" (bounded to `depth` cycles) or "prove" (unbounded, by k-induction with k = `depth`
+    or by PDR). `engines` overrides the default of smtbmc with yices, and `timeout` (in
+    seconds) makes sby give up on a proof that takes longer.
+
+    With `portfolio`, every available engine in `PORTFOLIO` is started at once and sby stops
+    the others as soon as one of them returns. The winner is recorded under `name`, and
+    later proofs of the same name try it on its own before falling back to the race.
+    """
+    options = dict(mode=mode, depth=depth, timeout=timeout, cache=cache)
+    if not portfolio:
+        returncode, stdout = _sby(uut_rtlil, tmp_path, engines or ["smtbmc"], **options)
+        return returncode == 0, stdout
+
+    cache = ProofCache.default() if cache else None
+    engines = availableEngines(mode)
+
+    # the fastest engine for a bounded proof isn't necessarily the fastest for induction
+    if name is not None:
+        name = f"{name}.{mode}"
+
+    winner = None
+    if cache is not None and name is not None:
+        winner = cache.getEngine(name)
+    if winner in engines:
+        returncode, stdout = _sby(uut_rtlil, tmp_path, [winner], **options)
+        # 0 is a pass and 2 is a failure; anything else is inconclusive, so race
+        if returncode in (0, 2):
+            return returncode == 0, stdout
+
+    returncode, stdout = _sby(uut_rtlil, tmp_path, engines, **options)
+    # in prove mode, the base case passing only means the race isn't over yet: the winner is
+    # whichever engine finished the induction step (or PDR)
+    match = re.search(
+        r"summary: engine_\d+ \(([^)]*)\) returned (FAIL|pass(?! for basecase))", stdout
+    )
+    if match and cache is not None and name is not None:
+        cache.putEngine(name, match.group(1))
+    return returncode == 0, stdout
+
+
+def assertFormal(
+    uut, tmp_path, *, mode="bmc", depth=1, engines=None, portfolio=None, timeout=None
+):
+    if portfolio is None:
+        portfolio = usePortfolio
+
+    # a proof of this spec may already be running in the background (see
+    # snoot4.tests.runner.prefetch), in which case we only need to wait for its result
+    prefetched = _prefetched.pop(type(uut), None)
+    if prefetched is not None and (mode, depth, engines) == ("bmc", 1, None):
+        uut._MustUse__used = True
+        passed, stdout, _ = prefetched.result()
+    else:
+        name = specName(type(uut))
+        passed, stdout = runFormal(
+            convertFormal(uut),
+            tmp_path,
+            mode=mode,
+            depth=depth,
+            engines=engines,
+            portfolio=portfolio,
+            name=name,
+            timeout=timeout,
+        )
+
+    if not passed:
+        pytest.fail(stdout)
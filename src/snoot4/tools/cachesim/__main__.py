@@ -0,0 +1,55 @@
+import argparse
+import sys
+
+from snoot4.mem.model import simulate_icache
+
+
+def readTrace(file):
+    """Fetch addresses from `file`, one hexadecimal address a line, ignoring `#` comments."""
+    trace = []
+    for line in file:
+        line = line.split("#", 1)[0].strip()
+        if line:
+            trace.append(int(line, 16))
+    return trace
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="pdm cachesim")
+    parser.add_argument("--size", type=int, default=8192, help="bytes (default: 8192)")
+    parser.add_argument("--line", type=int, default=32, help="bytes per line (default: 32)")
+    parser.add_argument("--ways", type=int, default=2, help="associativity (default: 2)")
+    parser.add_argument(
+        "--latency",
+        type=int,
+        default=8,
+        help="cycles from a refill starting to its first word arriving (default: 8)",
+    )
+    parser.add_argument(
+        "trace",
+        type=argparse.FileType("r"),
+        nargs="?",
+        default=sys.stdin,
+        help="instruction trace, one hexadecimal address a line (default: stdin)",
+    )
+    args = parser.parse_args()
+
+    trace = readTrace(args.trace)
+    if not trace:
+        parser.error("trace is empty")
+    try:
+        result = simulate_icache(
+            trace, latency=args.latency, size=args.size, line=args.line, ways=args.ways
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"accesses  {result['accesses']}")
+    print(f"hits      {result['hits']}")
+    print(f"refills   {result['misses']}")
+    print(f"hit rate  {result['hit_rate']:.1%}")
+    print(f"latency   {result['latency']:.2f} cycles")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+from snoot4.rf.gold import RegisterFileEquivalence
+from snoot4.rf.sim import RegisterFileSim
+from snoot4.tests.utils import availableEngines, convertFormal, runFormal
+
+IMPLS = {"sim": RegisterFileSim}
+
+
+def _status(passed, stdout):
+    if passed:
+        return "pass"
+    if "DONE (TIMEOUT" in stdout:
+        return "timeout"
+    return "FAIL"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="pdm equiv",
+        description="prove a register file equivalent to RegisterFileGold by k-induction, "
+        "reporting the proof time for each k",
+    )
+    parser.add_argument("impl", nargs="?", choices=IMPLS, default="sim")
+    parser.add_argument(
+        "-d",
+        "--depth",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="induction depths to sweep (default: 1 2 4 8)",
+    )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        action="append",
+        help="sby engine to use, may be repeated (default: every available engine)",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=int,
+        default=300,
+        help="seconds to give each proof before moving on (default: 300)",
+    )
+    args = parser.parse_args()
+
+    uut_rtlil = convertFormal(RegisterFileEquivalence(IMPLS[args.impl]))
+    engines = args.engine or availableEngines("prove")
+
+    print(f"{'engine':<20} {'k':>3} {'status':<8} {'time':>9}")
+    for engine in engines:
+        for depth in args.depth:
+            start = time.perf_counter()
+            with tempfile.TemporaryDirectory(prefix="snoot4-") as tmp_path:
+                passed, stdout = runFormal(
+                    uut_rtlil,
+                    Path(tmp_path),
+                    mode="prove",
+                    depth=depth,
+                    engines=[engine],
+                    timeout=args.timeout,
+                    cache=False,
+                )
+            seconds = time.perf_counter() - start
+            status = _status(passed, stdout)
+            print(f"{engine:<20} {depth:>3} {status:<8} {seconds:8.2f}s", flush=True)
+
+
+if __name__ == "__main__":
+    main()
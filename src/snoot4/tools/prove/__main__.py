@@ -0,0 +1,66 @@
+import argparse
+import collections
+import sys
+
+from snoot4.tests.runner import discover, prove
+from snoot4.tests.utils import specBase, specName
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="pdm prove")
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="number of proofs to run at once (default: #CPUs)"
+    )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        action="store_true",
+        help="check all specs of the same gate with a single solver run",
+    )
+    parser.add_argument(
+        "-p",
+        "--portfolio",
+        action="store_true",
+        help="race every available solver engine and keep the first result",
+    )
+    parser.add_argument(
+        "filter", nargs="*", help="only prove specs whose name contains one of these"
+    )
+    args = parser.parse_args()
+
+    specs = [
+        spec
+        for spec in discover()
+        if not args.filter or any(f in specName(spec) for f in args.filter)
+    ]
+
+    batch_sizes = collections.Counter(specBase(spec) for spec in specs)
+
+    failed = []
+    for spec, passed, stdout, seconds in prove(
+        specs, jobs=args.jobs, batch=args.batch, portfolio=args.portfolio
+    ):
+        status = "PASS" if passed else "FAIL"
+        if seconds is None:
+            print(f"{status} {'':8}  {specName(spec)}", flush=True)
+        elif args.batch and batch_sizes[specBase(spec)] > 1:
+            # the time of a batch covers every spec of its gate, listed after this one
+            print(f"{status} {seconds:7.2f}s  {specName(spec)}  (whole batch)", flush=True)
+        else:
+            print(f"{status} {seconds:7.2f}s  {specName(spec)}", flush=True)
+        if not passed:
+            failed.append((spec, stdout))
+
+    for spec, stdout in failed:
+        print()
+        print(f"=== {specName(spec)} ===")
+        print(stdout)
+
+    print()
+    print(f"{len(specs) - len(failed)} passed, {len(failed)} failed")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import functools
+import json
+from pathlib import Path
+import re
+import subprocess
+import tempfile
+
+import sys
+
+from amaranth._toolchain import require_tool
+from amaranth.back import rtlil
+
+from snoot4.be.backend import Backend
+from snoot4.be.units import Alu, AluCmp, Cmp, Div, MemoryRead, MemoryWrite, Mul
+from snoot4.be.units.adder import Adder
+from snoot4.be.units.alu import AluShift
+from snoot4.fe.decode import Decoder
+from snoot4.fe.fetch import Fetch
+from snoot4.mem.dcache import DCache
+from snoot4.mem.icache import ICache
+from snoot4.mem.sq import StoreQueue
+from snoot4.mem.wishbone import WishboneMaster
+from snoot4.rf.mem import RegisterFileMem
+from snoot4.rf.sim import RegisterFileSim
+
+DESIGNS = {
+    "rf.sim": RegisterFileSim,
+    "rf.mem": RegisterFileMem,
+    "decode": Decoder,
+    "shift": AluShift,
+    "mem.read": MemoryRead,
+    "mem.write": MemoryWrite,
+    **{f"div.{steps}": functools.partial(Div, steps=steps) for steps in [1, 2, 4]},
+    **{f"mul.{latency}": functools.partial(Mul, latency=latency) for latency in [1, 2, 3]},
+    **{
+        f"{name}.{arch.value}": functools.partial(cls, **{kwarg: arch})
+        for name, cls, kwarg in [
+            ("adder", Adder, "arch"),
+            ("alu", Alu, "adder"),
+            ("cmp", Cmp, "adder"),
+            ("alucmp", AluCmp, "adder"),
+        ]
+        for arch in Adder.Arch
+    },
+    **{f"fetch.{p}": functools.partial(Fetch, predictor=p) for p in ["static", "bimodal"]},
+    "icache": ICache,
+    "dcache": DCache,
+    "sq": StoreQueue,
+    "wishbone": WishboneMaster,
+    **{f"backend.{issue}": functools.partial(Backend, issue=issue) for issue in [1, 2]},
+}
+
+# the stored results `--compare` checks against by default, rewritten with `--json`
+BASELINE = Path(__file__).parent / "baseline.json"
+
+TARGETS = {
+    # technology independent: 4-input LUTs and generic flops
+    "generic": "synth -flatten -top top; abc -lut 4; opt_clean",
+    "ice40": "synth_ice40 -top top",
+    "ecp5": "synth_ecp5 -top top",
+}
+
+# how yosys calls each kind of cell we count, on every target
+_LUTS = {"$lut", "SB_LUT4", "LUT4"}
+_RAMS = {"SB_RAM40_4K", "TRELLIS_DPR16X4", "DP16KD"}
+_DSPS = {"$mul", "SB_MAC16", "MULT18X18D"}
+
+
+def _isFlop(cell_type):
+    return "DFF" in cell_type or cell_type == "TRELLIS_FF"
+
+
+def synthesize(design, target):
+    """
+    Synthesise `design` for `target` with yosys, returning the number of cells of each
+    type in the result, and the length of its longest combinational path in cells.
+    """
+    with tempfile.TemporaryDirectory(prefix="snoot4-") as tmp_path:
+        tmp_path = Path(tmp_path)
+        (tmp_path / "top.il").write_text(rtlil.convert(design))
+
+        # paths are relative, as yosys may be sandboxed to the working directory
+        script = "; ".join(
+            [
+                "read_ilang top.il",
+                TARGETS[target],
+                "tee -q -o stat.json stat -json",
+                "tee -q -o ltp.txt ltp -noff",
+            ]
+        )
+        subprocess.run(
+            [require_tool("yosys"), "-q", "-p", script],
+            cwd=tmp_path,
+            check=True,
+        )
+        stat = json.loads((tmp_path / "stat.json").read_text())
+        ltp = (tmp_path / "ltp.txt").read_text()
+
+    depth = int(re.search(r"\(length=(\d+)\)", ltp).group(1))
+    return stat["design"]["num_cells_by_type"], depth
+
+
+def summarize(cells, depth):
+    return {
+        "depth": depth,
+        "cells": sum(cells.values()),
+        "luts": sum(n for cell_type, n in cells.items() if cell_type in _LUTS),
+        "ffs": sum(n for cell_type, n in cells.items() if _isFlop(cell_type)),
+        "rams": sum(n for cell_type, n in cells.items() if cell_type in _RAMS),
+        "dsps": sum(n for cell_type, n in cells.items() if cell_type in _DSPS),
+    }
+
+
+def compare(results, baseline, *, tolerance=0):
+    """
+    Returns a line for each figure in `results` more than `tolerance` percent worse than
+    in `baseline`. Both map design names to targets to summaries.
+    """
+    regressions = []
+    for name, targets in results.items():
+        for target, summary in targets.items():
+            before = baseline.get(name, {}).get(target)
+            if before is None:
+                continue
+            for key, value in summary.items():
+                if value > before[key] * (1 + tolerance / 100):
+                    regressions.append(f"{name} {target}: {key} {before[key]} -> {value}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="pdm synth")
+    parser.add_argument(
+        "-t",
+        "--target",
+        action="append",
+        choices=TARGETS,
+        help="FPGA family to synthesise for, may be repeated (default: all)",
+    )
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        nargs="?",
+        const=BASELINE,
+        help="fail if any result is worse than in this file (default: the stored baseline)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0,
+        help="percentage by which a result may be worse than the baseline (default: 0)",
+    )
+    parser.add_argument(
+        "design", nargs="*", help=f"designs to synthesise (default: all of {', '.join(DESIGNS)})"
+    )
+    args = parser.parse_args()
+
+    for name in args.design:
+        if name not in DESIGNS:
+            parser.error(f"unknown design {name!r}")
+
+    designs = args.design or list(DESIGNS)
+    targets = args.target or list(TARGETS)
+
+    print(
+        f"{'design':<20} {'target':<8} {'depth':>5} {'cells':>7} {'LUTs':>7} {'FFs':>7} "
+        f"{'RAMs':>5} {'DSPs':>5}"
+    )
+    results = {}
+    for name in designs:
+        for target in targets:
+            summary = summarize(*synthesize(DESIGNS[name](), target))
+            results.setdefault(name, {})[target] = summary
+            print(
+                f"{name:<20} {target:<8} {summary['depth']:>5} {summary['cells']:>7} "
+                f"{summary['luts']:>7} {summary['ffs']:>7} {summary['rams']:>5} {summary['dsps']:>5}",
+                flush=True,
+            )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()